@@ -0,0 +1,36 @@
+"""post comment count
+
+Revision ID: a7e4c2f9b031
+Revises: f2d8b6c0a519
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e4c2f9b031'
+down_revision: Union[str, Sequence[str], None] = 'f2d8b6c0a519'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('comment_count', sa.Integer(), server_default=sa.text('0'), nullable=False), schema='linap')
+    op.execute("""
+        UPDATE linap.posts p
+        SET comment_count = s.cnt
+        FROM (
+            SELECT post_id, count(*) AS cnt FROM linap.comments
+            WHERE NOT is_deleted GROUP BY post_id
+        ) s
+        WHERE p.id = s.post_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('posts', 'comment_count', schema='linap')
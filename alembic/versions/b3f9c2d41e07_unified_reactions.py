@@ -0,0 +1,61 @@
+"""unified reactions
+
+Revision ID: b3f9c2d41e07
+Revises: 2dbb4d950187, a1b2c3d4e5f6
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f9c2d41e07'
+down_revision: Union[str, Sequence[str], None] = ('2dbb4d950187', 'a1b2c3d4e5f6')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Оставляем по одной (последней) реакции пользователя на объект
+    op.execute("""
+DELETE FROM linap.likes l
+USING linap.likes newer
+WHERE l.user_id = newer.user_id
+  AND l.target_type = newer.target_type
+  AND l.target_id = newer.target_id
+  AND (l.created_at, l.id) < (newer.created_at, newer.id)
+""")
+    op.add_column('likes', sa.Column('prev_value', sa.Integer(), server_default=sa.text('0'), nullable=False), schema='linap')
+    op.create_unique_constraint('uq_likes_user_target', 'likes', ['user_id', 'target_type', 'target_id'], schema='linap')
+
+    for table in ('posts', 'comments'):
+        op.add_column(table, sa.Column('likes', sa.Integer(), server_default=sa.text('0'), nullable=False), schema='linap')
+        op.add_column(table, sa.Column('dislikes', sa.Integer(), server_default=sa.text('0'), nullable=False), schema='linap')
+
+    # Начальные агрегаты для постов и комментариев считаем по журналу лайков
+    for table, target in (('posts', 'post'), ('comments', 'comment')):
+        op.execute(f"""
+UPDATE linap.{table} t
+SET likes = agg.likes, dislikes = agg.dislikes
+FROM (
+    SELECT target_id,
+           count(*) FILTER (WHERE value = 1) AS likes,
+           count(*) FILTER (WHERE value = -1) AS dislikes
+    FROM linap.likes
+    WHERE target_type = '{target}'
+    GROUP BY target_id
+) agg
+WHERE t.id = agg.target_id
+""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('comments', 'posts'):
+        op.drop_column(table, 'dislikes', schema='linap')
+        op.drop_column(table, 'likes', schema='linap')
+    op.drop_constraint('uq_likes_user_target', 'likes', schema='linap', type_='unique')
+    op.drop_column('likes', 'prev_value', schema='linap')
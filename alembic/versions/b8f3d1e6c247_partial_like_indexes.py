@@ -0,0 +1,59 @@
+"""partial indexes for active reactions
+
+Revision ID: b8f3d1e6c247
+Revises: a7e4c2f9b031
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f3d1e6c247'
+down_revision: Union[str, Sequence[str], None] = 'a7e4c2f9b031'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Снятые реакции (value = 0) остаются в журнале, но в списки не попадают:
+# частичный индекс меньше и не содержит мёртвых строк
+ACTIVE = sa.text('value <> 0')
+
+NEW_INDEXES = [
+    ('idx_likes_target_active', 'likes', ['target_type', 'target_id', 'created_at', 'id'], ACTIVE),
+    ('idx_likes_user_active', 'likes', ['user_id', 'created_at', 'id'], ACTIVE),
+]
+
+OLD_INDEXES = [
+    ('idx_likes_target_created', 'likes', ['target_type', 'target_id', 'created_at', 'id'], None),
+    ('idx_likes_user_created', 'likes', ['user_id', 'created_at', 'id'], None),
+]
+
+
+def _create(indexes) -> None:
+    for name, table, columns, where in indexes:
+        op.create_index(
+            name, table, columns, schema='linap', postgresql_where=where,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def _drop(indexes) -> None:
+    for name, table, _, _ in indexes:
+        op.drop_index(name, table_name=table, schema='linap', postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись; новые индексы строятся до удаления старых
+    with op.get_context().autocommit_block():
+        _create(NEW_INDEXES)
+        _drop(OLD_INDEXES)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        _create(OLD_INDEXES)
+        _drop(NEW_INDEXES)
@@ -0,0 +1,57 @@
+"""keyset pagination indexes
+
+Revision ID: c4a8e1f9d203
+Revises: b3f9c2d41e07
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8e1f9d203'
+down_revision: Union[str, Sequence[str], None] = 'b3f9c2d41e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (имя, таблица, колонки) - под сортировку (ключ, id) постраничной выдачи
+NEW_INDEXES = [
+    ('idx_videos_owner_created', 'videos', ['owner_id', 'created_at', 'id']),
+    ('idx_videos_published_created', 'videos', ['published', 'created_at', 'id']),
+    ('idx_videos_agent_views', 'videos', ['agent', 'views', 'id']),
+    ('idx_videos_map_views', 'videos', ['map_id', 'views', 'id']),
+    ('idx_posts_owner_created', 'posts', ['owner_id', 'created_at', 'id']),
+    ('idx_posts_published_created', 'posts', ['published', 'created_at', 'id']),
+    ('idx_comments_post_created', 'comments', ['post_id', 'created_at', 'id']),
+    ('idx_comments_user_created', 'comments', ['user_id', 'created_at', 'id']),
+    ('idx_likes_target_created', 'likes', ['target_type', 'target_id', 'created_at', 'id']),
+    ('idx_likes_user_created', 'likes', ['user_id', 'created_at', 'id']),
+]
+
+# Старые индексы, которые покрываются префиксом новых
+OLD_INDEXES = [
+    ('idx_videos_owner', 'videos', ['owner_id']),
+    ('idx_posts_owner', 'posts', ['owner_id']),
+    ('idx_comments_post', 'comments', ['post_id']),
+    ('idx_likes_target', 'likes', ['target_type', 'target_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns in NEW_INDEXES:
+            op.create_index(name, table, columns, schema='linap', postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in OLD_INDEXES:
+            op.drop_index(name, table_name=table, schema='linap', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in OLD_INDEXES:
+            op.create_index(name, table, columns, schema='linap', postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in NEW_INDEXES:
+            op.drop_index(name, table_name=table, schema='linap', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,52 @@
+"""full-text search vectors
+
+Revision ID: d5b7f3a2c914
+Revises: c4a8e1f9d203
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b7f3a2c914'
+down_revision: Union[str, Sequence[str], None] = 'c4a8e1f9d203'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Выражения должны совпадать с Computed(...) в моделях
+SEARCH_VECTORS = [
+    ('videos', "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+               "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"),
+    ('posts', "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+              "setweight(to_tsvector('simple', coalesce(excerpt, '')), 'B') || "
+              "setweight(to_tsvector('simple', coalesce(content, '')), 'C')"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, expression in SEARCH_VECTORS:
+        op.add_column(
+            table,
+            sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(expression, persisted=True)),
+            schema='linap',
+        )
+    with op.get_context().autocommit_block():
+        for table, _ in SEARCH_VECTORS:
+            op.create_index(
+                f'idx_{table}_search', table, ['search_vector'], schema='linap',
+                postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table, _ in SEARCH_VECTORS:
+            op.drop_index(f'idx_{table}_search', table_name=table, schema='linap', postgresql_concurrently=True, if_exists=True)
+    for table, _ in SEARCH_VECTORS:
+        op.drop_column(table, 'search_vector', schema='linap')
@@ -0,0 +1,68 @@
+"""post tag array and tag usage counters
+
+Revision ID: e6c1a9b4f378
+Revises: d5b7f3a2c914
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c1a9b4f378'
+down_revision: Union[str, Sequence[str], None] = 'd5b7f3a2c914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tags', sa.Column('post_count', sa.Integer(), server_default=sa.text('0'), nullable=False), schema='linap')
+    op.add_column(
+        'posts',
+        sa.Column('tag_slugs', postgresql.ARRAY(sa.String(length=64)), server_default=sa.text("'{}'"), nullable=False),
+        schema='linap',
+    )
+
+    # Заполняем денормализованные данные из post_tags
+    op.execute("""
+        UPDATE linap.posts p
+        SET tag_slugs = s.slugs
+        FROM (
+            SELECT pt.post_id, array_agg(t.slug ORDER BY t.slug) AS slugs
+            FROM linap.post_tags pt
+            JOIN linap.tags t ON t.id = pt.tag_id
+            GROUP BY pt.post_id
+        ) s
+        WHERE p.id = s.post_id
+    """)
+    # Счётчик - только по опубликованным постам, как фасеты и лента
+    op.execute("""
+        UPDATE linap.tags t
+        SET post_count = s.cnt
+        FROM (
+            SELECT pt.tag_id, count(*) AS cnt
+            FROM linap.post_tags pt
+            JOIN linap.posts p ON p.id = pt.post_id
+            WHERE p.published
+            GROUP BY pt.tag_id
+        ) s
+        WHERE t.id = s.tag_id
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_posts_tag_slugs', 'posts', ['tag_slugs'], schema='linap',
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_posts_tag_slugs', table_name='posts', schema='linap', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('posts', 'tag_slugs', schema='linap')
+    op.drop_column('tags', 'post_count', schema='linap')
@@ -0,0 +1,72 @@
+"""materialized comment paths
+
+Revision ID: f2d8b6c0a519
+Revises: e6c1a9b4f378
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d8b6c0a519'
+down_revision: Union[str, Sequence[str], None] = 'e6c1a9b4f378'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('comments', sa.Column('path', sa.Text(collation='C'), nullable=True), schema='linap')
+    op.add_column('comments', sa.Column('depth', sa.Integer(), server_default=sa.text('0'), nullable=False), schema='linap')
+    op.add_column('comments', sa.Column('reply_count', sa.Integer(), server_default=sa.text('0'), nullable=False), schema='linap')
+
+    # Ключ узла тот же, что в CommentService.create_comment: микросекунды created_at + 8 hex id
+    op.execute("""
+        WITH RECURSIVE tree AS (
+            SELECT id, 0 AS depth,
+                   lpad(to_hex((extract(epoch FROM created_at) * 1000000)::bigint), 14, '0')
+                   || left(replace(id::text, '-', ''), 8) AS path
+            FROM linap.comments
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT c.id, t.depth + 1,
+                   t.path || '.' || lpad(to_hex((extract(epoch FROM c.created_at) * 1000000)::bigint), 14, '0')
+                   || left(replace(c.id::text, '-', ''), 8)
+            FROM linap.comments c
+            JOIN tree t ON c.parent_id = t.id
+        )
+        UPDATE linap.comments c
+        SET path = tree.path, depth = tree.depth
+        FROM tree
+        WHERE c.id = tree.id
+    """)
+    op.execute("""
+        UPDATE linap.comments c
+        SET reply_count = s.cnt
+        FROM (SELECT parent_id, count(*) AS cnt FROM linap.comments WHERE parent_id IS NOT NULL GROUP BY parent_id) s
+        WHERE c.id = s.parent_id
+    """)
+    op.alter_column('comments', 'path', nullable=False, schema='linap')
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_comments_post_path', 'comments', ['post_id', 'path'], schema='linap',
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'idx_comments_post_roots', 'comments', ['post_id', 'created_at', 'id'], schema='linap',
+            postgresql_where=sa.text('parent_id IS NULL'), postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_comments_post_roots', table_name='comments', schema='linap', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_comments_post_path', table_name='comments', schema='linap', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('comments', 'reply_count', schema='linap')
+    op.drop_column('comments', 'depth', schema='linap')
+    op.drop_column('comments', 'path', schema='linap')
@@ -0,0 +1,78 @@
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+
+from app.core.security import TokenData, decode_access_token
+from app.core.settings.settings import settings
+
+
+class TokenCache:
+    """Кэш проверенных токенов: ключ - sha256 токена, живёт до exp токена"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._data: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[TokenData]:
+        key = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, token_data = item
+                if expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return token_data
+                del self._data[key]
+            self.misses += 1
+
+        token_data = decode_access_token(token)
+        # Кэшируем только валидные токены с exp, чтобы мусорные токены не вытесняли нужные
+        if token_data is not None and token_data.exp is not None:
+            with self._lock:
+                self._data[key] = (token_data.exp.timestamp(), token_data)
+                self._data.move_to_end(key)
+                while len(self._data) > self.max_entries:
+                    self._data.popitem(last=False)
+        return token_data
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+
+
+def verify_token(token: str) -> Optional[TokenData]:
+    """Проверить JWT с использованием кэша"""
+    return token_cache.get(token)
+
+
+def get_current_user(authorization: Optional[str] = Header(None)) -> TokenData:
+    """Получить текущего пользователя из токена"""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    token = authorization.split(" ")[1]
+    token_data = verify_token(token)
+
+    if not token_data:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return token_data
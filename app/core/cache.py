@@ -0,0 +1,203 @@
+import asyncio
+import inspect
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Optional
+
+import pydantic_core
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.log import get_logger
+from app.core.settings.settings import settings
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+log = get_logger("cache").limit("invalidation_listener_failed", per_second=1)
+
+
+class LocalLRU:
+    """Ограниченный по размеру LRU с TTL в памяти процесса"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: tuple, value: bytes, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear_namespace(self, namespace: str) -> None:
+        for key in [k for k in self._data if k[0] == namespace]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class ResponseCache:
+    """Двухуровневый кэш ответов: LRU процесса перед общим Redis"""
+
+    def __init__(self, redis_url: Optional[str], ttl: int, local_ttl: int, local_max_entries: int):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.local = LocalLRU(local_max_entries)
+        self.redis: Optional[aioredis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self.redis_url and self.redis is None:
+            self.redis = aioredis.from_url(self.redis_url)
+            self._listener = asyncio.create_task(self._listen_invalidations())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+
+    @staticmethod
+    def _redis_key(namespace: str, key: str) -> str:
+        return f"cache:{namespace}:{key}"
+
+    @staticmethod
+    def _keys_set(namespace: str) -> str:
+        return f"cache:{namespace}:keys"
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        value = self.local.get((namespace, key))
+        if value is not None or self.redis is None:
+            return value
+        try:
+            value = await self.redis.get(self._redis_key(namespace, key))
+        except RedisError:
+            return None
+        if value is not None:
+            self.local.set((namespace, key), value, min(self.local_ttl, self.ttl))
+        return value
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        ttl = ttl or self.ttl
+        self.local.set((namespace, key), value, min(self.local_ttl, ttl))
+        if self.redis is None:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(self._redis_key(namespace, key), value, ex=ttl)
+                pipe.sadd(self._keys_set(namespace), key)
+                pipe.expire(self._keys_set(namespace), ttl)
+                await pipe.execute()
+        except RedisError:
+            pass
+
+    async def invalidate(self, namespace: str) -> None:
+        """Сбросить все закэшированные ответы пространства имён во всех воркерах"""
+        self.local.clear_namespace(namespace)
+        if self.redis is None:
+            return
+        try:
+            keys = await self.redis.smembers(self._keys_set(namespace))
+            async with self.redis.pipeline(transaction=False) as pipe:
+                if keys:
+                    pipe.delete(*[self._redis_key(namespace, k.decode()) for k in keys])
+                pipe.delete(self._keys_set(namespace))
+                pipe.publish(INVALIDATION_CHANNEL, namespace)
+                await pipe.execute()
+        except RedisError:
+            pass
+
+    async def _listen_invalidations(self) -> None:
+        """Чистить локальный уровень по сообщениям других воркеров"""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Пока подписки не было, сообщения могли потеряться: локальный уровень
+                # мог пропустить инвалидацию, поэтому сбрасываем его целиком
+                self.local.clear()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        data = message["data"]
+                        self.local.clear_namespace(data.decode() if isinstance(data, bytes) else str(data))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("invalidation_listener_failed", error=e)
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+response_cache = ResponseCache(
+    settings.REDIS_URL,
+    ttl=settings.CACHE_TTL,
+    local_ttl=settings.CACHE_LOCAL_TTL,
+    local_max_entries=settings.CACHE_LOCAL_MAX_ENTRIES,
+)
+
+
+def request_cache_key(request: Request) -> str:
+    """Ключ кэша: путь роута и отсортированные query-параметры"""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def cached(namespace: str, ttl: Optional[int] = None):
+    """Декоратор GET-роута: отдаёт готовый JSON из кэша, иначе кэширует результат"""
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        inject_request = "request" not in signature.parameters
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs.pop("request") if inject_request else kwargs["request"]
+            key = request_cache_key(request)
+
+            body = await response_cache.get(namespace, key)
+            if body is not None:
+                return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response):
+                if result.status_code != 200 or result.media_type != "application/json":
+                    return result
+                body = result.body
+            else:
+                body = pydantic_core.to_json(jsonable_encoder(result))
+            await response_cache.set(namespace, key, body, ttl)
+            return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+        if inject_request:
+            parameters = list(signature.parameters.values())
+            parameters.append(inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+            wrapper.__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+
+    return decorator
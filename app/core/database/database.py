@@ -1,19 +1,105 @@
+from fastapi import Request
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
     async_sessionmaker
 )
+from sqlalchemy.orm import Session
 from app.core.settings.settings import settings
+from app.core.database.pool_stats import PoolStats, instrumented_pool_class, pool_stats
+from app.core.database.read_routing import ReadYourWritesTracker, client_key
+from app.core.metrics import instrument_engine
 
-engine = create_async_engine(
-    str(settings.db_url),
+
+def _create_engine(url: str, stats: PoolStats):
+    engine = create_async_engine(
+        url,
+        poolclass=instrumented_pool_class(stats),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+    instrument_engine(engine)
+    return engine
+
+
+engine = _create_engine(str(settings.db_url), pool_stats)
+
+replica_pool_stats = PoolStats()
+replica_engine = (
+    _create_engine(settings.db_replica_url, replica_pool_stats)
+    if settings.db_replica_url
+    else engine
 )
 
+read_tracker = ReadYourWritesTracker(settings.READ_AFTER_WRITE_WINDOW, settings.REDIS_URL)
+
+
+class PrimarySession(Session):
+    """Сессия основной базы: помечает, что в транзакции была запись"""
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _flag_flush(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _flag_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _clear_writes(session):
+    session.info.pop("has_writes", None)
+
+
+class PrimaryAsyncSession(AsyncSession):
+    """После коммита с записью отмечает клиента - до ответа, чтобы его следующее чтение уже шло на основную базу"""
+
+    async def commit(self) -> None:
+        await super().commit()
+        request = self.info.get("request")
+        # Без реплики все чтения и так идут на основную базу
+        if self.info.pop("has_writes", False) and request is not None and replica_engine is not engine:
+            await read_tracker.mark_write(client_key(request))
+
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
+    class_=PrimaryAsyncSession,
+    sync_session_class=PrimarySession,
+)
+
+ReadSessionLocal = async_sessionmaker(
+    bind=replica_engine,
     class_=AsyncSession,
 )
 
-async def get_db():
+async def get_db(request: Request):
     async with AsyncSessionLocal() as session:
+        session.info["request"] = request
         yield session
+
+
+async def get_read_db(request: Request):
+    """Сессия для read-only роутов: реплика, но основная база сразу после записи"""
+    if replica_engine is engine or await read_tracker.is_sticky(client_key(request)):
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        async with ReadSessionLocal() as session:
+            yield session
+
+
+def get_pool_stats() -> dict:
+    """Статистика пулов соединений"""
+    stats = pool_stats.snapshot(engine.pool)
+    if replica_engine is not engine:
+        stats["replica"] = replica_pool_stats.snapshot(replica_engine.pool)
+    return stats
@@ -0,0 +1,89 @@
+import time
+from bisect import bisect_left
+from threading import Lock
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Границы корзин гистограммы ожидания соединения, в миллисекундах
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolStats:
+    """Счётчики выдачи соединений из пула"""
+
+    def __init__(self, buckets_ms: tuple = CHECKOUT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            # Последняя корзина - всё, что больше самой большой границы
+            self.histogram = [0] * (len(self.buckets_ms) + 1)
+
+    def observe(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            self.histogram[bisect_left(self.buckets_ms, wait_ms)] += 1
+
+    def checkout_histogram(self) -> tuple:
+        """Корзины ожидания (последняя - больше всех границ) и суммарное ожидание, мс"""
+        with self._lock:
+            return list(self.histogram), self.wait_total_ms
+
+    def snapshot(self, pool=None) -> dict:
+        """Текущее состояние пула и накопленная статистика ожидания"""
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_total_ms": round(self.wait_total_ms, 3),
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "checkout_latency_ms": {
+                    **{f"le_{b}": n for b, n in zip(self.buckets_ms, self.histogram)},
+                    "le_inf": self.histogram[-1],
+                },
+            }
+        if pool is not None:
+            data.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Очередь соединений, замеряющая время ожидания свободного соединения"""
+
+    stats: PoolStats = pool_stats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.observe((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        self.stats.observe((time.perf_counter() - start) * 1000)
+        return conn
+
+
+def instrumented_pool_class(stats: PoolStats) -> type:
+    """Класс пула, пишущий статистику в отдельный объект (переживает engine.dispose)"""
+    return type("InstrumentedQueuePool", (InstrumentedQueuePool,), {"stats": stats})
@@ -0,0 +1,96 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from fastapi import Request
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.auth import verify_token
+from app.core.log import get_logger
+
+log = get_logger("read_routing").limit("redis_failed", per_second=1)
+
+
+class ReadYourWritesTracker:
+    """Помнит, кто недавно писал в базу, чтобы читать его данные с основной базы.
+
+    С Redis отметка общая для всех воркеров: запись, обработанная одним воркером,
+    переводит следующее чтение клиента на основную базу и в любом другом. Без Redis
+    (или при его ошибке) отметка видна только воркеру, который обработал запись.
+    """
+
+    def __init__(self, window_seconds: float, redis_url: Optional[str] = None, max_entries: int = 100_000):
+        self.window_seconds = window_seconds
+        self.redis_url = redis_url
+        self.max_entries = max_entries
+        self.redis: Optional[aioredis.Redis] = None
+        self._lock = Lock()
+        self._until: "OrderedDict[str, float]" = OrderedDict()
+
+    async def start(self) -> None:
+        if self.redis_url and self.redis is None:
+            self.redis = aioredis.from_url(self.redis_url)
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+
+    @staticmethod
+    def _redis_key(key: str) -> str:
+        return f"read_after_write:{key}"
+
+    async def mark_write(self, key: Optional[str]) -> None:
+        if not key or self.window_seconds <= 0:
+            return
+        self._mark_local(key)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(self._redis_key(key), 1, px=int(self.window_seconds * 1000))
+        except RedisError as e:
+            log.warning("redis_failed", op="mark_write", error=e)
+
+    async def is_sticky(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        if self._is_sticky_local(key):
+            return True
+        if self.redis is None:
+            return False
+        try:
+            return bool(await self.redis.exists(self._redis_key(key)))
+        except RedisError as e:
+            log.warning("redis_failed", op="is_sticky", error=e)
+            return False
+
+    def _mark_local(self, key: str) -> None:
+        with self._lock:
+            self._until[key] = time.monotonic() + self.window_seconds
+            self._until.move_to_end(key)
+            while len(self._until) > self.max_entries:
+                self._until.popitem(last=False)
+
+    def _is_sticky_local(self, key: str) -> bool:
+        with self._lock:
+            until = self._until.get(key)
+            if until is None:
+                return False
+            if until < time.monotonic():
+                del self._until[key]
+                return False
+            return True
+
+
+def client_key(request: Request) -> Optional[str]:
+    """Ключ клиента: id пользователя из токена, иначе IP"""
+    authorization = request.headers.get("authorization")
+    if authorization and authorization.startswith("Bearer "):
+        token_data = verify_token(authorization.split(" ")[1])
+        if token_data:
+            return f"user:{token_data.user_id}"
+    if request.client:
+        return f"ip:{request.client.host}"
+    return None
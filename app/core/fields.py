@@ -0,0 +1,60 @@
+from typing import FrozenSet, List, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from pydantic import AliasChoices, BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, selectinload
+
+
+class FieldSelection(NamedTuple):
+    """Выбранные поля: имена в схеме ответа и соответствующие атрибуты модели"""
+    output: FrozenSet[str]
+    attributes: FrozenSet[str]
+
+
+def _attribute_name(schema: type[BaseModel], name: str) -> str:
+    # thumbnail_url в ответе читается из thumb_url модели и т.п.
+    alias = schema.model_fields[name].validation_alias
+    if isinstance(alias, AliasChoices):
+        alias = alias.choices[0]
+    return alias if isinstance(alias, str) else name
+
+
+def parse_fields(fields: Optional[str], schema: type[BaseModel]) -> Optional[FieldSelection]:
+    """Разобрать ?fields=a,b,c по полям схемы ответа; id включается всегда"""
+    if not fields:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - schema.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    names.add("id")
+    return FieldSelection(
+        output=frozenset(names),
+        attributes=frozenset(_attribute_name(schema, name) for name in names),
+    )
+
+
+def sparse_options(model, selection: FieldSelection, *required, loaders: Optional[dict] = None) -> List:
+    """load_only по выбранным колонкам и загрузка выбранных связей.
+
+    required - колонки, без которых не построить курсор (ключ сортировки).
+    loaders - свои опции загрузки связей по имени, по умолчанию selectinload.
+    Остальные колонки не выбираются вовсе, обращение к ним - ошибка, а не
+    скрытый запрос на каждую строку.
+    """
+    mapper = inspect(model)
+    columns = {column.key for column in required}
+    relationships = []
+    for name in selection.attributes:
+        if name in mapper.column_attrs:
+            columns.add(name)
+        elif name in mapper.relationships:
+            # selectinload связи по внешнему ключу нужен сам ключ
+            for column in mapper.relationships[name].local_columns:
+                columns.add(mapper.get_property_by_column(column).key)
+            relationships.append((loaders or {}).get(name) or selectinload(getattr(model, name)))
+    return [load_only(*(getattr(model, name) for name in columns), raiseload=True), *relationships]
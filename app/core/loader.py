@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from fastapi import HTTPException, status
+from sqlalchemy import any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def parse_ids(ids: str, max_ids: int) -> List[uuid.UUID]:
+    """Разобрать ?ids=a,b,c в список UUID без повторов с сохранением порядка"""
+    try:
+        parsed = list(dict.fromkeys(uuid.UUID(i.strip()) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid id in ids"
+        )
+    if not parsed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids is empty"
+        )
+    if len(parsed) > max_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many ids, at most {max_ids} allowed"
+        )
+    return parsed
+
+
+class BatchLoader:
+    """Загрузчик строк одной модели по id в рамках одного запроса.
+
+    Все load() за один проход цикла событий сливаются в один
+    SELECT ... WHERE id = ANY(:ids); повторный id берётся из памяти.
+    """
+
+    def __init__(self, session: AsyncSession, lock: asyncio.Lock, model, options: Sequence = ()):
+        self.session = session
+        self.lock = lock
+        self.model = model
+        self.options = options
+        self._futures: Dict[Any, asyncio.Future] = {}
+        self._pending: List[Any] = []
+        # Ссылки на выполняющиеся выборки: задачу без ссылок может собрать GC
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key) -> "asyncio.Future[Optional[Any]]":
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            self._pending.append(key)
+            if len(self._pending) == 1:
+                # Выборка - на следующем проходе цикла, когда соберутся все load() этого прохода
+                loop.call_soon(self._schedule_dispatch)
+        return future
+
+    def _schedule_dispatch(self) -> None:
+        task = asyncio.get_running_loop().create_task(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def load_many(self, keys: Sequence) -> List[Optional[Any]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    async def _dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        try:
+            ids = bindparam("ids", keys, type_=ARRAY(self.model.id.type))
+            # AsyncSession не допускает параллельных запросов - загрузчики делят один замок
+            async with self.lock:
+                result = await self.session.execute(
+                    select(self.model).where(self.model.id == any_(ids)).options(*self.options)
+                )
+            rows = {row.id: row for row in result.scalars().all()}
+        except asyncio.CancelledError:
+            for key in keys:
+                self._futures.pop(key).cancel()
+            raise
+        except Exception as e:
+            # Ошибка выборки достаётся каждому, кто ждёт её ключи
+            for key in keys:
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(rows.get(key))
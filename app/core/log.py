@@ -0,0 +1,206 @@
+import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+import pydantic_core
+
+from app.core.settings.settings import settings
+
+# uvicorn пишет своими обработчиками синхронно - переводим его логгеры в общий вывод
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+
+def _quote(value) -> str:
+    text = str(value)
+    if not text or any(c in text for c in ' ="\n'):
+        return pydantic_core.to_json(text).decode()
+    return text
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Строка вида: время уровень логгер событие key=value ..."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        parts = [self.formatTime(record, "%Y-%m-%dT%H:%M:%S"), record.levelname, record.name, record.getMessage()]
+        parts.extend(f"{key}={_quote(value)}" for key, value in getattr(record, "fields", {}).items())
+        line = " ".join(parts)
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на запись - для сборщиков логов"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return pydantic_core.to_json(data, fallback=str).decode()
+
+
+class BackgroundHandler(QueueHandler):
+    """Кладёт запись в очередь как есть: форматирование и запись - в потоке слушателя.
+
+    Очередь ограничена: при переполнении запись отбрасывается, а не блокирует event loop.
+    """
+
+    def __init__(self, max_size: int):
+        super().__init__(queue.Queue(max_size))
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimit:
+    """Не больше per_second записей события в секунду; остальные считаются"""
+
+    __slots__ = ("per_second", "window", "count", "suppressed")
+
+    def __init__(self, per_second: int):
+        self.per_second = per_second
+        self.window = 0
+        self.count = 0
+        self.suppressed = 0
+
+    def allow(self, now: float) -> Optional[int]:
+        """None - запись отбросить, иначе сколько записей пропущено перед ней"""
+        window = int(now)
+        if window != self.window:
+            self.window, self.count = window, 0
+        if self.count >= self.per_second:
+            self.suppressed += 1
+            return None
+        self.count += 1
+        suppressed, self.suppressed = self.suppressed, 0
+        return suppressed
+
+
+class StructLogger:
+    """Логгер событий: log.info("login_failed", user=..., reason=...)"""
+
+    def __init__(self, name: str):
+        self.logger = logging.getLogger(name)
+        self._limits: Dict[str, RateLimit] = {}
+
+    def limit(self, event: str, per_second: Optional[int] = None) -> "StructLogger":
+        """Ограничить частоту шумного события (по умолчанию LOG_RATE_LIMIT в секунду)"""
+        self._limits[event] = RateLimit(per_second or settings.LOG_RATE_LIMIT)
+        return self
+
+    def _log(self, level: int, event: str, fields: dict, exc_info: bool = False) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        limit = self._limits.get(event)
+        if limit is not None:
+            suppressed = limit.allow(time.monotonic())
+            if suppressed is None:
+                return
+            if suppressed:
+                fields["suppressed"] = suppressed
+        self.logger.log(level, event, exc_info=exc_info, extra={"fields": fields}, stacklevel=3)
+
+    def debug(self, event: str, **fields) -> None:
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event: str, **fields) -> None:
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event: str, **fields) -> None:
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event: str, **fields) -> None:
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event: str, **fields) -> None:
+        """ERROR с трейсбеком текущего исключения (форматируется уже в потоке записи)"""
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+
+def get_logger(name: str) -> StructLogger:
+    return StructLogger(name)
+
+
+def parse_levels(levels: str) -> Dict[str, str]:
+    """LOG_LEVELS="auth=DEBUG,uvicorn.access=WARNING" -> {логгер: уровень}"""
+    result = {}
+    for item in levels.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            result[name.strip()] = level.strip().upper()
+    return result
+
+
+class LogOutput:
+    """Вывод логов: в фоновом режиме - очередь и поток, пишущий в stdout"""
+
+    def __init__(self):
+        self.handler: Optional[BackgroundHandler] = None
+        self.listener: Optional[QueueListener] = None
+
+    @staticmethod
+    def _stream_handler() -> logging.Handler:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else KeyValueFormatter())
+        return handler
+
+    @staticmethod
+    def _install(handler: logging.Handler) -> None:
+        root = logging.getLogger()
+        for old in list(root.handlers):
+            root.removeHandler(old)
+        root.addHandler(handler)
+        root.setLevel(settings.LOG_LEVEL.upper())
+        for name in UVICORN_LOGGERS:
+            logger = logging.getLogger(name)
+            logger.handlers.clear()
+            logger.propagate = True
+        for name, level in parse_levels(settings.LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+
+    def configure(self, background: bool = True) -> None:
+        """Настроить логирование процесса; background=False - писать сразу (мастер без event loop)"""
+        self.stop()
+        if not background:
+            self._install(self._stream_handler())
+            return
+        self.handler = BackgroundHandler(settings.LOG_QUEUE_SIZE)
+        self.listener = QueueListener(self.handler.queue, self._stream_handler())
+        self._install(self.handler)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Дописать очередь и остановить поток; поздние записи идут напрямую"""
+        if self.listener is None:
+            return
+        self.listener.stop()
+        self.listener = None
+        self._install(self._stream_handler())
+
+    def snapshot(self) -> dict:
+        if self.handler is None:
+            return {"background": False}
+        return {
+            "background": self.listener is not None,
+            "queued": self.handler.queue.qsize(),
+            "dropped": self.handler.dropped,
+        }
+
+
+log_output = LogOutput()
@@ -0,0 +1,377 @@
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import query_guard
+from app.core.log import get_logger
+from app.core.settings.settings import settings
+
+log = get_logger("metrics").limit("dump_failed", per_second=1)
+
+# Границы корзин гистограмм, в секундах
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class RequestStats:
+    """Что потратил один запрос: число запросов к БД, время в БД и на сериализацию"""
+
+    __slots__ = ("queries", "db_time", "serialize_time", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        # Нормализованный SQL -> [повторы, место вызова] для детектора N+1
+        self.statements: Dict[str, list] = {}
+
+
+# Статистика текущего HTTP-запроса; вне запроса (фоновые задачи) - None
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    """Гистограмма с метками: счётчики по корзинам, сумма и число наблюдений"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.series: Dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            # Последняя корзина - всё, что больше самой большой границы
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def dump(self) -> list:
+        return [[list(labels), counts, total] for labels, (counts, total) in self.series.items()]
+
+    def merge(self, dumped: list) -> None:
+        """Прибавить гистограмму другого воркера (корзины те же)"""
+        for labels, counts, total in dumped:
+            series = self.series.setdefault(tuple(labels), [[0] * (len(self.buckets) + 1), 0.0])
+            series[0] = [a + b for a, b in zip(series[0], counts)]
+            series[1] += total
+
+
+def _dump_counters(counters: dict) -> list:
+    return [[list(labels), value] for labels, value in counters.items()]
+
+
+def _merge_counters(counters: dict, dumped: list) -> None:
+    for labels, value in dumped:
+        labels = tuple(labels)
+        counters[labels] = counters.get(labels, 0) + value
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsWriter:
+    """Текстовый формат Prometheus (version 0.0.4)"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def header(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: float, names: tuple = (), values: tuple = ()) -> None:
+        self.lines.append(f"{name}{_labels(names, values)} {_number(value)}")
+
+    def metric(self, name: str, kind: str, help_text: str, series: Dict[tuple, float], names: tuple = ()) -> None:
+        self.header(name, kind, help_text)
+        for values, value in sorted(series.items()):
+            self.sample(name, value, names, values)
+
+    def histogram(self, name: str, help_text: str, histogram: Histogram, names: tuple = ()) -> None:
+        self.header(name, "histogram", help_text)
+        for values, (counts, total) in sorted(histogram.series.items()):
+            self.buckets(name, histogram.buckets, counts, names, values)
+            self.sample(f"{name}_sum", total, names, values)
+            self.sample(f"{name}_count", sum(counts), names, values)
+
+    def buckets(self, name: str, bounds: tuple, counts: list, names: tuple = (), values: tuple = ()) -> None:
+        """Корзины гистограммы; counts - по корзинам, последняя - больше всех границ"""
+        cumulative = 0
+        for bound, count in zip(bounds + ("+Inf",), counts):
+            cumulative += count
+            le = 'le="%s"' % bound
+            self.lines.append(f"{name}_bucket{_labels(names, values, le)} {cumulative}")
+
+    def snapshot(self, prefix: str, help_text: str, series: Dict[tuple, dict], names: tuple = ()) -> None:
+        """Числовые поля snapshot() (/health/...) как gauge-метрики prefix_<поле>.
+
+        series - {значения меток: snapshot}, для одного объекта без меток - {(): snapshot}.
+        """
+        keys = dict.fromkeys(key for data in series.values() for key in data)
+        for key in keys:
+            samples = {
+                values: data[key] for values, data in series.items()
+                if isinstance(data.get(key), (int, float)) and not isinstance(data.get(key), bool)
+            }
+            if not samples:
+                continue
+            self.metric(f"{prefix}_{key}", "gauge", f"{help_text}: {key}", samples, names)
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+class Metrics:
+    """Метрики HTTP и БД процесса (у каждого воркера - свои, /metrics складывает их через MetricsStore).
+
+    Обновляются только из event loop, поэтому без блокировок.
+    """
+
+    LABELS = ("method", "route")
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency = Histogram()
+        self.db_time = Histogram()
+        self.db_queries: Dict[Tuple[str, str], int] = {}
+        self.serialize_time: Dict[Tuple[str, str], float] = {}
+        self.queries = Histogram()
+
+    def observe_request(self, method: str, route: str, status_code: int, elapsed: float, stats: RequestStats) -> None:
+        key = (method, route)
+        self.requests[(method, route, status_code)] = self.requests.get((method, route, status_code), 0) + 1
+        self.latency.observe(key, elapsed)
+        self.db_time.observe(key, stats.db_time)
+        self.db_queries[key] = self.db_queries.get(key, 0) + stats.queries
+        self.serialize_time[key] = self.serialize_time.get(key, 0.0) + stats.serialize_time
+
+    def dump(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "requests": _dump_counters(self.requests),
+            "latency": self.latency.dump(),
+            "db_time": self.db_time.dump(),
+            "db_queries": _dump_counters(self.db_queries),
+            "serialize_time": _dump_counters(self.serialize_time),
+            "queries": self.queries.dump(),
+        }
+
+    def merge(self, dumped: dict, alive: bool = True) -> None:
+        """Прибавить метрики другого воркера; счётчики остановленного тоже (иначе они бы "сбросились")"""
+        if alive:
+            self.in_flight += dumped["in_flight"]
+        _merge_counters(self.requests, dumped["requests"])
+        self.latency.merge(dumped["latency"])
+        self.db_time.merge(dumped["db_time"])
+        _merge_counters(self.db_queries, dumped["db_queries"])
+        _merge_counters(self.serialize_time, dumped["serialize_time"])
+        self.queries.merge(dumped["queries"])
+
+    def write(self, out: MetricsWriter) -> None:
+        out.metric("linap_http_requests_in_flight", "gauge", "HTTP requests being served", {(): self.in_flight})
+        out.metric(
+            "linap_http_requests_total", "counter", "HTTP requests by route and status",
+            self.requests, self.LABELS + ("status",)
+        )
+        out.histogram("linap_http_request_duration_seconds", "HTTP request latency", self.latency, self.LABELS)
+        out.histogram("linap_http_request_db_seconds", "Time spent in DB queries per request", self.db_time, self.LABELS)
+        out.metric(
+            "linap_http_request_db_queries_total", "counter", "DB queries issued by requests",
+            self.db_queries, self.LABELS
+        )
+        out.metric(
+            "linap_http_request_serialize_seconds_total", "counter", "Time spent serializing response bodies",
+            self.serialize_time, self.LABELS
+        )
+        out.histogram("linap_db_query_duration_seconds", "DB query latency, including background work", self.queries)
+
+
+metrics = Metrics()
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsStore:
+    """Метрики воркеров в общем каталоге METRICS_DIR, как multiprocess-режим prometheus_client.
+
+    Каждый воркер раз в interval_ms переписывает свой файл <pid>.json; /metrics в любом
+    воркере читает все файлы. Файлы остановленных воркеров остаются, поэтому счётчики
+    при перезапуске воркера не уменьшаются. Без каталога (один процесс) - только свои метрики.
+    """
+
+    def __init__(self, interval_ms: int):
+        self.interval = interval_ms / 1000
+        self.directory: Optional[Path] = None
+        self._collect: Optional[Callable[[], dict]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{os.getpid()}.json"
+
+    def start(self, collect: Callable[[], dict]) -> None:
+        """collect() - метрики этого воркера (вызывается в event loop)"""
+        self._collect = collect
+        # Каталог читается на старте воркера: app.server задаёт его после импорта модулей
+        self.directory = Path(settings.METRICS_DIR) if settings.METRICS_DIR else None
+        if self.directory is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.dump()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.dump()
+
+    async def dump(self) -> None:
+        data = self._collect()
+        try:
+            await asyncio.to_thread(self._write, data)
+        except OSError as e:
+            log.warning("dump_failed", path=str(self.path), error=e)
+
+    def _write(self, data: dict) -> None:
+        # Запись во временный файл и rename: читатель не увидит файл наполовину
+        path = self.path
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp, path)
+
+    def _read_all(self) -> List[Tuple[int, bool, dict]]:
+        workers = []
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                pid = int(path.stem)
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            workers.append((pid, pid == os.getpid() or _alive(pid), data))
+        return workers
+
+    async def collect(self) -> List[Tuple[int, bool, dict]]:
+        """Метрики всех воркеров: (pid, жив ли, данные); свои - свежие, на момент вызова"""
+        if self.directory is None:
+            return [(os.getpid(), True, self._collect())]
+        await self.dump()
+        return await asyncio.to_thread(self._read_all)
+
+
+metrics_store = MetricsStore(settings.METRICS_FLUSH_INTERVAL_MS)
+
+
+def record_serialize(elapsed: float) -> None:
+    stats = current_request.get()
+    if stats is not None:
+        stats.serialize_time += elapsed
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Замер каждого запроса к БД; время относится к текущему HTTP-запросу"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        metrics.queries.observe((), elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+            query_guard.observe(stats.statements, stats.queries, statement)
+        query_guard.observe_slow(statement, parameters, elapsed)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _error(exception_context):
+        # Упавший запрос не доходит до after_cursor_execute
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: задержка, статус и время в БД по каждому маршруту"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.in_flight -= 1
+            current_request.reset(token)
+            # Шаблон маршрута, а не сырой путь: иначе метка на каждый id
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            metrics.observe_request(scope["method"], route, status_code, elapsed, stats)
+            query_guard.report(f"{scope['method']} {route}", stats.queries, stats.statements)
+
+
+@contextmanager
+def track_queries(label: str):
+    """Учёт запросов к БД вне HTTP (скрипты, тесты) с теми же проверками, что у запросов API"""
+    stats = RequestStats()
+    token = current_request.set(stats)
+    try:
+        yield stats
+    finally:
+        current_request.reset(token)
+    query_guard.report(label, stats.queries, stats.statements)
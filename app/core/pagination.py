@@ -0,0 +1,85 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+
+def encode_cursor(sort_key: str, value: Any, row_id: uuid.UUID) -> str:
+    """Упаковать позицию (значение сортировки, id) в непрозрачный токен"""
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps([sort_key, value, str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _python_type(column) -> Optional[type]:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def _matches_type(value: Any, value_type: Optional[type]) -> bool:
+    if value_type is None:
+        return True
+    if isinstance(value, bool):
+        return value_type is bool
+    if value_type is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, value_type)
+
+
+def decode_cursor(sort_key: str, cursor: str, value_type: Optional[type] = None) -> Tuple[Any, uuid.UUID]:
+    """Распаковать токен; токен от другой сортировки или с чужим типом значения невалиден"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if key != sort_key:
+            raise ValueError(key)
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        if not _matches_type(value, value_type):
+            raise TypeError(value)
+        return value, uuid.UUID(row_id)
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def cursor_sort_key(cursor: str) -> Optional[str]:
+    """Сортировка, для которой выдан токен (None - токен не читается)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))[0]
+    except (ValueError, TypeError, KeyError, IndexError):
+        return None
+    return key if isinstance(key, str) else None
+
+
+def keyset_paginate(query, sort_column, id_column, cursor: Optional[str], limit: int, descending: bool = True):
+    """Добавить к запросу условие продолжения после курсора, сортировку и limit + 1"""
+    if cursor:
+        value, row_id = decode_cursor(sort_column.key, cursor, _python_type(sort_column))
+        position = tuple_(sort_column, id_column)
+        query = query.where(position < (value, row_id) if descending else position > (value, row_id))
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    return query.limit(limit + 1)
+
+
+def keyset_page(rows: Sequence, sort_column, limit: int) -> Tuple[List, Optional[str]]:
+    """Обрезать лишнюю строку и вернуть курсор следующей страницы"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort_column.key, getattr(last, sort_column.key), last.id)
@@ -0,0 +1,118 @@
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import greenlet
+
+from app.core.log import get_logger
+from app.core.settings.settings import settings
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+APP_DIR = str(ROOT / "app")
+CORE_DIR = str(ROOT / "app" / "core")
+
+log = get_logger("queries").limit("slow_query").limit("too_many_queries")
+
+_SPACES = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMS = re.compile(r"\$\d+|%\(\w+\)s|%s|\?")
+_LISTS = re.compile(r"\(\?(?:, ?\?)+\)")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Строгий режим: запрос к API выполнил слишком много или слишком медленные запросы к БД"""
+
+
+@lru_cache(maxsize=2048)
+def normalize(statement: str) -> str:
+    """SQL без литералов и номеров параметров: одинаковые запросы - одна строка"""
+    sql = _SPACES.sub(" ", statement).strip()
+    sql = _LITERALS.sub("?", _PARAMS.sub("?", sql))
+    return _LISTS.sub("(?)", sql)
+
+
+def call_site() -> Optional[str]:
+    """Ближайший к запросу код приложения вне app/core (сервис, роут)"""
+    frame = sys._getframe()
+    current = greenlet.getcurrent()
+    while frame is not None or current is not None:
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(APP_DIR) and not filename.startswith(CORE_DIR):
+                return f"{Path(filename).relative_to(ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}"
+            frame = frame.f_back
+        # SQLAlchemy выполняет запрос в своём greenlet: вызывающий код - в родительском
+        current = current.parent if current is not None else None
+        frame = current.gr_frame if current is not None else None
+    return None
+
+
+def _short(parameters, limit: int = 500) -> str:
+    text = repr(parameters)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def observe(statements: Dict[str, list], queries: int, statement: str) -> None:
+    """Учесть запрос к БД в рамках HTTP-запроса: statements - {SQL: [повторы, место вызова]}"""
+    sql = normalize(statement)
+    entry = statements.get(sql)
+    if entry is None:
+        statements[sql] = [1, None]
+        entry = statements[sql]
+    else:
+        entry[0] += 1
+        # Место вызова ищем только у повторов - первый запрос ничего не стоит
+        if entry[1] is None:
+            entry[1] = call_site()
+    if settings.QUERY_GUARD_STRICT:
+        if settings.QUERY_REPEAT_LIMIT and entry[0] > settings.QUERY_REPEAT_LIMIT:
+            raise QueryBudgetExceeded(
+                f"Statement repeated {entry[0]} times (limit {settings.QUERY_REPEAT_LIMIT}) at {entry[1]}: {sql}"
+            )
+        if settings.QUERY_COUNT_LIMIT and queries > settings.QUERY_COUNT_LIMIT:
+            raise QueryBudgetExceeded(f"{queries} queries in one request (limit {settings.QUERY_COUNT_LIMIT})")
+
+
+def observe_slow(statement: str, parameters, elapsed: float) -> None:
+    """Медленный запрос - с параметрами и местом вызова (и вне HTTP-запросов тоже)"""
+    if not settings.SLOW_QUERY_MS or elapsed * 1000 < settings.SLOW_QUERY_MS:
+        return
+    site = call_site()
+    log.warning(
+        "slow_query",
+        elapsed_ms=round(elapsed * 1000, 1),
+        site=site,
+        sql=_SPACES.sub(" ", statement).strip(),
+        params=_short(parameters),
+    )
+    if settings.QUERY_GUARD_STRICT:
+        raise QueryBudgetExceeded(
+            f"Query took {elapsed * 1000:.0f} ms (limit {settings.SLOW_QUERY_MS:g} ms) at {site}"
+        )
+
+
+def repeated(statements: Dict[str, list], top: int = 3) -> List[dict]:
+    """Самые частые повторы (признак N+1)"""
+    items = sorted(
+        ((count, sql, site) for sql, (count, site) in statements.items() if count > 1),
+        key=lambda item: item[0],
+        reverse=True,
+    )
+    return [{"count": count, "sql": sql, "site": site} for count, sql, site in items[:top]]
+
+
+def report(label: str, queries: int, statements: Dict[str, list]) -> None:
+    """В конце запроса: предупредить, если превышен предел запросов или повторов"""
+    worst = max((count for count, _ in statements.values()), default=0)
+    over_count = settings.QUERY_COUNT_LIMIT and queries > settings.QUERY_COUNT_LIMIT
+    over_repeat = settings.QUERY_REPEAT_LIMIT and worst > settings.QUERY_REPEAT_LIMIT
+    if over_count or over_repeat:
+        log.warning(
+            "too_many_queries",
+            route=label,
+            queries=queries,
+            distinct=len(statements),
+            repeated=repeated(statements),
+        )
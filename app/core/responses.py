@@ -0,0 +1,68 @@
+import time
+from functools import lru_cache
+from typing import Any, FrozenSet, List, Optional, get_args, get_origin
+
+import pydantic_core
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from app.core.fields import FieldSelection
+from app.core.metrics import record_serialize
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON-ответ, сериализуемый pydantic-core вместо json.dumps"""
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        body = pydantic_core.to_json(content)
+        record_serialize(time.perf_counter() - started)
+        return body
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema) -> TypeAdapter:
+    # Сериализатор схемы строится один раз и переиспользуется
+    return TypeAdapter(schema)
+
+
+def _list_item(annotation) -> Optional[type[BaseModel]]:
+    if get_origin(annotation) in (list, List):
+        (item,) = get_args(annotation)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item
+    return None
+
+
+@lru_cache(maxsize=None)
+def sparse_schema(schema: type[BaseModel], fields: FrozenSet[str]) -> type[BaseModel]:
+    """Схема только с выбранными полями; у страницы сужаются элементы списка"""
+    items = {name: _list_item(field.annotation) for name, field in schema.model_fields.items()}
+    is_page = any(items.values())
+    definitions = {}
+    for name, field in schema.model_fields.items():
+        if items[name] is not None:
+            definitions[name] = (List[sparse_schema(items[name], fields)], field)
+        elif is_page or name in fields:
+            definitions[name] = (field.annotation, field)
+    return create_model(
+        schema.__name__,
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+def schema_response(
+    schema,
+    content: Any,
+    status_code: int = 200,
+    fields: Optional[FieldSelection] = None
+) -> Response:
+    """Провести ORM-объекты через схему ответа и сразу отдать готовые байты JSON"""
+    if fields is not None:
+        schema = sparse_schema(schema, fields.output)
+    started = time.perf_counter()
+    adapter = _adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    record_serialize(time.perf_counter() - started)
+    return Response(content=body, status_code=status_code, media_type="application/json")
@@ -1,9 +1,16 @@
-from datetime import datetime, timedelta
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from threading import Lock
 from typing import Optional
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
 
+from app.core.settings.settings import settings
+
 # Configuration
 SECRET_KEY = "your-secret-key-change-in-production"  # Менять в production!
 ALGORITHM = "HS256"
@@ -29,6 +36,80 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """bcrypt в отдельном ограниченном пуле потоков, чтобы не блокировать event loop"""
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency_total_ms = 0.0
+        self.latency_max_ms = 0.0
+
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.completed += 1
+                self.latency_total_ms += elapsed_ms
+                self.latency_max_ms = max(self.latency_max_ms, elapsed_ms)
+
+    async def _run(self, func, *args):
+        # Очередь переполнена - отказываем сразу, а не копим ожидание
+        if self.pending >= self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, try again later",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(pwd_context.verify, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pending": self.pending,
+                "queue_limit": self.queue_limit,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "latency_avg_ms": round(self.latency_total_ms / self.completed, 3) if self.completed else 0.0,
+                "latency_max_ms": round(self.latency_max_ms, 3),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_LIMIT)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Проверить пароль в пуле bcrypt"""
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Хэшировать пароль в пуле bcrypt"""
+    return await password_hasher.hash(password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Создать JWT токен"""
     to_encode = data.copy()
@@ -50,7 +131,12 @@ def decode_access_token(token: str) -> Optional[TokenData]:
         username: str = payload.get("username")
         if user_id is None or username is None:
             return None
-        token_data = TokenData(user_id=user_id, username=username)
+        exp = payload.get("exp")
+        token_data = TokenData(
+            user_id=user_id,
+            username=username,
+            exp=datetime.fromtimestamp(exp, tz=timezone.utc) if exp is not None else None
+        )
         return token_data
     except JWTError:
         return None
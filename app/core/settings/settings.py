@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 from yarl import URL
 
@@ -9,6 +11,94 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     API_BASE_PORT: int
 
+    # Пул соединений с Postgres
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Реплика для чтения (если не задана - читаем с основной базы)
+    POSTGRES_REPLICA_HOST: Optional[str] = None
+    POSTGRES_REPLICA_PORT: Optional[int] = None
+    # Сколько секунд после записи читать пользователя с основной базы
+    READ_AFTER_WRITE_WINDOW: float = 5.0
+
+    # Отложенная запись счётчиков просмотров
+    VIEW_FLUSH_INTERVAL_MS: int = 1000
+    VIEW_FLUSH_MAX_EVENTS: int = 500
+
+    # Кэш публичных лент: локальный LRU + Redis (если задан REDIS_URL)
+    REDIS_URL: Optional[str] = None
+    CACHE_TTL: int = 30
+    CACHE_LOCAL_TTL: int = 5
+    CACHE_LOCAL_MAX_ENTRIES: int = 1024
+
+    # "Горячие" видео: период полураспада счёта, веса событий, размер рейтинга
+    TRENDING_HALF_LIFE_HOURS: float = 24.0
+    TRENDING_VIEW_WEIGHT: float = 1.0
+    TRENDING_LIKE_WEIGHT: float = 5.0
+    TRENDING_MAX_ITEMS: int = 10000
+    TRENDING_FLUSH_INTERVAL_MS: int = 1000
+    # За сколько часов лайков и новых видео засевать пустой рейтинг на старте
+    TRENDING_SEED_HOURS: int = 168
+
+    # Загрузка видео по частям
+    UPLOAD_MAX_BYTES: int = 500 * 1024 * 1024
+    UPLOAD_MAX_CHUNK_BYTES: int = 16 * 1024 * 1024
+    UPLOAD_EXPIRE_HOURS: int = 24
+
+    # Отдача видео: размер куска и лимит скорости на соединение (байт/с, 0 - без лимита)
+    VIDEO_STREAM_CHUNK_BYTES: int = 256 * 1024
+    VIDEO_STREAM_RATE_LIMIT: int = 0
+
+    # Пул потоков для bcrypt: число потоков и максимум ожидающих задач
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
+
+    # Кэш проверенных JWT
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+
+    # Максимум id в одном batch-запросе
+    BATCH_MAX_IDS: int = 300
+
+    # Запуск: dev - create_all на старте; fast - только сверка ревизии Alembic и прогрев
+    STARTUP_MODE: Literal["dev", "fast"] = "dev"
+    # Сколько соединений открыть и прогреть до готовности (0 - DB_POOL_SIZE)
+    WARMUP_CONNECTIONS: int = 0
+
+    # Боевой запуск (python -m app.server): адрес, число воркеров (0 - по числу ядер),
+    # очередь соединений и сколько секунд воркер дорабатывает запросы при остановке.
+    # WEB_DRAIN_SECONDS - сколько воркер после SIGTERM ещё принимает запросы, отвечая 503
+    # на /health/ready, чтобы балансировщик успел снять его с трафика (0 - сразу)
+    WEB_HOST: str = "0.0.0.0"
+    WEB_WORKERS: int = 0
+    WEB_BACKLOG: int = 2048
+    WEB_GRACEFUL_TIMEOUT: int = 30
+    WEB_DRAIN_SECONDS: int = 5
+
+    # Логи: общий уровень, уровни отдельных логгеров ("auth=DEBUG,uvicorn.access=WARNING"),
+    # формат text|json, размер очереди фоновой записи и лимит шумных событий в секунду
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_RATE_LIMIT: int = 10
+
+    # Детектор лишних запросов: предел запросов к БД на запрос API, повторов одного
+    # и того же SQL (N+1), порог медленного запроса в мс (0 - проверка выключена).
+    # strict - превышение становится ошибкой запроса (для тестов и локальной разработки)
+    QUERY_COUNT_LIMIT: int = 30
+    QUERY_REPEAT_LIMIT: int = 5
+    SLOW_QUERY_MS: float = 500
+    QUERY_GUARD_STRICT: bool = False
+
+    # Метрики воркеров: общий каталог, куда каждый воркер раз в интервал пишет свои
+    # метрики, чтобы /metrics отдавал сумму по всем (app.server создаёт временный сам)
+    METRICS_DIR: Optional[str] = None
+    METRICS_FLUSH_INTERVAL_MS: int = 1000
+
     class Config:
         env_file = ".env"
 
@@ -23,6 +113,19 @@ class Settings(BaseSettings):
             path=f"/{self.POSTGRES_DB}"
         ))
 
+    @property
+    def db_replica_url(self) -> Optional[str]:
+        if not self.POSTGRES_REPLICA_HOST:
+            return None
+        return str(URL.build(
+            scheme="postgresql+asyncpg",
+            host=self.POSTGRES_REPLICA_HOST,
+            port=self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT,
+            user=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            path=f"/{self.POSTGRES_DB}"
+        ))
+
     @property
     def db_url_sync(self) -> str:  
         return str(URL.build(
@@ -0,0 +1,173 @@
+import asyncio
+import inspect
+import time
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import urlencode
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import Float, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import configure_mappers
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+
+from app.core.responses import schema_response
+from app.core.settings.settings import settings
+from app.core.trending import trending
+from app.models.like import Like
+from app.models.video import Video
+from app.schemas.post import PostPage
+from app.schemas.tag import TagPage
+from app.schemas.video import VideoPage
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent.parent / "alembic.ini"
+
+# Первые страницы публичных лент, которые прогрев кладёт в кэш ответов:
+# (имя роута, query-параметры) - ключ кэша тот же, что у запроса без параметров
+PRELOADED_PAGES = [
+    ("get_all_videos", {}),
+    ("get_all_videos", {"sort": "hot"}),
+    ("get_published_posts", {}),
+    ("get_all_tags", {}),
+]
+
+
+def alembic_heads() -> List[str]:
+    """Head-ревизии из каталога миграций (файлы читаются локально, без БД)"""
+    return list(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads())
+
+
+async def check_schema_revision(engine: AsyncEngine) -> str:
+    """Один запрос вместо create_all: схема должна быть на head-ревизии Alembic"""
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        current = {row.version_num for row in result}
+    heads = set(alembic_heads())
+    if current != heads:
+        raise RuntimeError(
+            f"Database schema is at {sorted(current) or 'no revision'}, expected {sorted(heads)}: "
+            "run `alembic upgrade head` before starting in fast mode"
+        )
+    return ", ".join(sorted(heads))
+
+
+async def _warm_connection(engine: AsyncEngine, ready: asyncio.Event, opened: List[int], total: int) -> None:
+    async with engine.connect() as conn:
+        # Держим соединение, пока не откроются все - иначе пул отдаст одно и то же
+        opened.append(1)
+        if len(opened) == total:
+            ready.set()
+        await ready.wait()
+
+        # Горячие запросы: компиляция SQLAlchemy кэшируется на движок,
+        # подготовленные выражения asyncpg - на каждое соединение
+        from app.service.post_service import PostService
+        from app.service.tag_service import TagService
+        from app.service.video_service import VideoService
+
+        async with AsyncSession(bind=conn) as session:
+            videos, next_cursor = await VideoService(session).get_videos()
+            schema_response(VideoPage, {"videos": videos, "count": len(videos), "next_cursor": next_cursor})
+            posts, next_cursor = await PostService(session).get_published_posts()
+            schema_response(PostPage, {"posts": posts, "count": len(posts), "next_cursor": next_cursor})
+            tags, next_cursor = await TagService(session).get_all_tags()
+            schema_response(TagPage, {"tags": tags, "count": len(tags), "next_cursor": next_cursor})
+            await session.rollback()
+
+
+async def warmup(engine: AsyncEngine, connections: int) -> float:
+    """Прогреть воркер до приёма трафика: мапперы, сериализаторы, пул и запросы"""
+    started = time.perf_counter()
+    configure_mappers()
+    # Больше размера пула не открыть: остальные ждали бы освобождения навсегда
+    connections = max(1, min(connections, settings.DB_POOL_SIZE))
+    ready = asyncio.Event()
+    opened: List[int] = []
+    await asyncio.gather(*(_warm_connection(engine, ready, opened, connections) for _ in range(connections)))
+    return time.perf_counter() - started
+
+
+def _route_kwargs(endpoint, query: Dict[str, str], session: AsyncSession) -> dict:
+    """Аргументы вызова роута: значения по умолчанию из Query(...), параметры запроса и сессия"""
+    kwargs = {}
+    for name, parameter in inspect.signature(endpoint).parameters.items():
+        if name == "request":
+            continue
+        if name == "session":
+            kwargs[name] = session
+        elif name in query:
+            kwargs[name] = query[name]
+        else:
+            kwargs[name] = getattr(parameter.default, "default", parameter.default)
+    return kwargs
+
+
+async def preload_cache(app: FastAPI, engine: AsyncEngine) -> int:
+    """Положить в кэш ответов первые страницы лент - вызовом тех же роутов, что их отдают.
+
+    Ответ и ключ кэша формирует декоратор cached, так что первый запрос после
+    старта получает HIT. Страницы, уже лежащие в Redis, заново не считаются.
+    """
+    routes = {route.name: route for route in app.routes if isinstance(route, APIRoute)}
+    # Без рейтинга (несколько воркеров без Redis) "горячая" лента отвечает 503 - её не кэшируем
+    pages = [(name, query) for name, query in PRELOADED_PAGES if trending.available or query.get("sort") != "hot"]
+    async with AsyncSession(bind=engine) as session:
+        for name, query in pages:
+            route = routes[name]
+            request = Request({
+                "type": "http",
+                "method": "GET",
+                "path": route.path,
+                "query_string": urlencode(query).encode(),
+                "headers": [],
+            })
+            await route.endpoint(request=request, **_route_kwargs(route.endpoint, query, session))
+        await session.rollback()
+    return len(pages)
+
+
+async def seed_trending(engine: AsyncEngine) -> int:
+    """Засеять пустой рейтинг "горячих" по базе: лайки и новые видео за TRENDING_SEED_HOURS.
+
+    Лайк весит TRENDING_LIKE_WEIGHT в момент постановки; у просмотров времени нет,
+    поэтому они затухают от даты публикации видео. Возвращает число засеянных видео.
+    """
+    if not await trending.is_empty():
+        return 0
+    now = time.time()
+    since = now - settings.TRENDING_SEED_HOURS * 3600
+    # Затухший "на сейчас" вес: 2^((t - now) / период) <= 1, без переполнения
+    likes = (
+        select(
+            Like.target_id.label("video_id"),
+            func.sum(func.power(2.0, (func.extract("epoch", Like.created_at).cast(Float) - now) / trending.half_life)).label("weight")
+        )
+        .where(
+            Like.target_type == "video",
+            Like.value == 1,
+            Like.created_at >= func.to_timestamp(since)
+        )
+        .group_by(Like.target_id)
+        .subquery()
+    )
+    async with AsyncSession(bind=engine) as session:
+        result = await session.execute(
+            select(Video.id, Video.agent, Video.map_id, Video.created_at, Video.views, likes.c.weight)
+            .outerjoin(likes, likes.c.video_id == Video.id)
+            .where(
+                Video.published == True,
+                or_(Video.created_at >= func.to_timestamp(since), likes.c.weight.is_not(None))
+            )
+        )
+        rows = result.all()
+
+    entries = []
+    for row in rows:
+        weight = float(row.weight or 0) * settings.TRENDING_LIKE_WEIGHT
+        weight += row.views * settings.TRENDING_VIEW_WEIGHT * 2 ** ((row.created_at.timestamp() - now) / trending.half_life)
+        if weight > 0:
+            entries.append((row.id, trending.score(weight, now), trending.scopes(row.agent, row.map_id)))
+    return await trending.seed(entries)
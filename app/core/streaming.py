@@ -0,0 +1,166 @@
+import mimetypes
+import os
+import re
+import time
+from email.utils import formatdate
+from typing import Optional, Tuple
+
+import aiofiles
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(stat: os.stat_result) -> str:
+    """Строгий ETag: файлы видео после загрузки не изменяются"""
+    return f'"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+class RangeNotSatisfiable(ValueError):
+    """Корректный диапазон, который не пересекается с файлом (416)"""
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Один диапазон bytes=start-end -> (start, end) включительно.
+
+    None - заголовок не поддерживается (другие единицы, несколько диапазонов,
+    синтаксическая ошибка): по RFC 9110 он игнорируется и отдаётся весь файл.
+    RangeNotSatisfiable - диапазон корректен, но лежит за концом файла.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if start == "":
+        # bytes=-N: последние N байт
+        if end == "":
+            return None
+        if int(end) == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - int(end), 0), size - 1
+    start = int(start)
+    if end != "" and int(end) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    end = size - 1 if end == "" else min(int(end), size - 1)
+    return start, end
+
+
+class VideoFileResponse(Response):
+    """Отдача видеофайла с Range, условными запросами и ограничением скорости"""
+
+    def __init__(
+        self,
+        path: str,
+        stat: os.stat_result,
+        request_headers,
+        method: str = "GET",
+        chunk_size: int = 256 * 1024,
+        rate_limit: int = 0,
+        max_age: int = 86400
+    ):
+        self.path = path
+        self.stat = stat
+        self.method = method
+        self.chunk_size = chunk_size
+        self.rate_limit = rate_limit
+
+        size = stat.st_size
+        etag = file_etag(stat)
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+        self.background = None
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": last_modified,
+            "cache-control": f"public, max-age={max_age}",
+            "content-type": media_type,
+        }
+        self.status_code = 200
+        self.start, self.end = 0, size - 1
+
+        if_none_match = request_headers.get("if-none-match")
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+            self.status_code = 304
+            self.start, self.end = 0, -1
+        # If-Range: диапазон действует, только если файл не изменился
+        elif range_header and (not if_range or if_range in (etag, last_modified)):
+            try:
+                byte_range = parse_range(range_header, size)
+            except RangeNotSatisfiable:
+                self.status_code = 416
+                headers["content-range"] = f"bytes */{size}"
+                self.start, self.end = 0, -1
+            else:
+                if byte_range is not None:
+                    self.status_code = 206
+                    self.start, self.end = byte_range
+                    headers["content-range"] = f"bytes {self.start}-{self.end}/{size}"
+
+        if self.status_code != 304:
+            headers["content-length"] = str(max(self.end - self.start + 1, 0))
+        self.raw_headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        count = self.end - self.start + 1
+        if self.method == "HEAD" or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}) and not self.rate_limit:
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f.fileno(),
+                    "offset": self.start,
+                    "count": count,
+                    "more_body": False,
+                })
+            return
+
+        async with anyio.create_task_group() as task_group:
+            async def stream_and_cancel():
+                await self._stream(send, count)
+                task_group.cancel_scope.cancel()
+
+            task_group.start_soon(stream_and_cancel)
+            await self._wait_disconnect(receive)
+            task_group.cancel_scope.cancel()
+
+    async def _stream(self, send: Send, count: int) -> None:
+        started = time.monotonic()
+        sent = 0
+        async with aiofiles.open(self.path, "rb") as f:
+            await f.seek(self.start)
+            while sent < count:
+                chunk = await f.read(min(self.chunk_size, count - sent))
+                if not chunk:
+                    break
+                sent += len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": sent < count})
+                if self.rate_limit:
+                    # Держим среднюю скорость соединения не выше rate_limit байт/с
+                    delay = sent / self.rate_limit - (time.monotonic() - started)
+                    if delay > 0:
+                        await anyio.sleep(delay)
+        if sent < count:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    @staticmethod
+    async def _wait_disconnect(receive: Receive) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
@@ -0,0 +1,237 @@
+import asyncio
+import math
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.log import get_logger
+from app.core.settings.settings import settings
+
+# Точка отсчёта времени для счёта; её выбор не влияет на порядок
+EPOCH = 1767225600  # 2026-01-01 UTC
+
+log = get_logger("trending").limit("flush_failed", per_second=1).limit("top_failed", per_second=1)
+
+# Счёт хранится как log2(сумма весов * 2^(t / период полураспада)). Прибавление
+# события - log-сумма, затухание бесплатно: все счета в одной шкале времени,
+# поэтому порядок совпадает с порядком по затухшему счёту "на сейчас" и
+# числа растут линейно, без переполнения.
+ADD_SCRIPT = """
+local x = tonumber(ARGV[2])
+for _, key in ipairs(KEYS) do
+    local v = x
+    local s = redis.call('ZSCORE', key, ARGV[1])
+    if s then
+        s = tonumber(s)
+        local hi, lo = math.max(s, x), math.min(s, x)
+        v = hi + math.log(1 + 2 ^ (lo - hi)) / math.log(2)
+    end
+    redis.call('ZADD', key, v, ARGV[1])
+    if redis.call('ZCARD', key) > tonumber(ARGV[3]) then
+        redis.call('ZREMRANGEBYRANK', key, 0, 0)
+    end
+end
+"""
+
+
+def log_add(a: float, b: float) -> float:
+    hi, lo = max(a, b), min(a, b)
+    return hi + math.log2(1 + 2 ** (lo - hi))
+
+
+class LocalSortedSet:
+    """Отсортированное множество в памяти процесса (когда Redis не настроен)"""
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._scores: Dict[str, float] = {}
+        self._order: List[Tuple[float, str]] = []
+
+    def add(self, member: str, score: float) -> None:
+        old = self._scores.get(member)
+        if old is not None:
+            del self._order[bisect_left(self._order, (old, member))]
+            score = log_add(old, score)
+        self._scores[member] = score
+        insort(self._order, (score, member))
+        if len(self._order) > self.max_items:
+            _, dropped = self._order.pop(0)
+            del self._scores[dropped]
+
+    def top(self, offset: int, limit: int) -> List[Tuple[str, float]]:
+        end = max(len(self._order) - offset, 0)
+        return [(member, score) for score, member in reversed(self._order[max(end - limit, 0):end])]
+
+
+class TrendingIndex:
+    """Рейтинг "горячих" видео с экспоненциальным затуханием по времени.
+
+    События копятся в буфере и раз в flush_interval уходят в Redis ZSET одним
+    конвейером. Без Redis рейтинг ведётся в памяти процесса, но только если
+    local=True (один процесс): у нескольких воркеров рейтинги разошлись бы,
+    поэтому там рейтинг недоступен (available = False).
+    Рейтинги есть общий ("all") и по срезам ленты ("agent:<агент>", "map:<id карты>").
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str],
+        half_life_hours: float,
+        max_items: int,
+        flush_interval_ms: int,
+        local: bool = True
+    ):
+        self.redis_url = redis_url
+        self.local = local
+        self.half_life = half_life_hours * 3600
+        self.max_items = max_items
+        self.flush_interval = flush_interval_ms / 1000
+        self.redis: Optional[aioredis.Redis] = None
+        self._script = None
+        self._local: Dict[str, LocalSortedSet] = {}
+        self._pending: Dict[Tuple[Tuple[str, ...], str], float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self.redis_url and self.redis is None:
+            self.redis = aioredis.from_url(self.redis_url)
+            self._script = self.redis.register_script(ADD_SCRIPT)
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.redis is not None:
+            try:
+                await self.flush()
+            except RedisError as e:
+                log.error("final_flush_failed", error=e, pending=len(self._pending))
+            await self.redis.aclose()
+            self.redis = None
+
+    @staticmethod
+    def scopes(agent: Optional[str] = None, map_id=None) -> List[str]:
+        scopes = ["all"]
+        if agent:
+            scopes.append(f"agent:{agent}")
+        if map_id:
+            scopes.append(f"map:{map_id}")
+        return scopes
+
+    @staticmethod
+    def _key(scope: str) -> str:
+        return f"trending:videos:{scope}"
+
+    @property
+    def available(self) -> bool:
+        """Ведётся ли рейтинг: в Redis или (один воркер) в памяти процесса"""
+        return self.redis is not None or self.local
+
+    def score(self, weight: float, at: Optional[float] = None) -> float:
+        """Счёт события с весом weight в момент at (по умолчанию - сейчас)"""
+        at = time.time() if at is None else at
+        return (at - EPOCH) / self.half_life + math.log2(weight)
+
+    def record(self, video_id, weight: float, scopes: Sequence[str]) -> None:
+        """Учесть событие (просмотр, лайк) с весом weight в момент "сейчас" """
+        if weight <= 0 or not self.available:
+            return
+        score = self.score(weight)
+        member = str(video_id)
+        if self.redis is None:
+            for scope in scopes:
+                self._local.setdefault(scope, LocalSortedSet(self.max_items)).add(member, score)
+            return
+        key = (tuple(self._key(scope) for scope in scopes), member)
+        old = self._pending.get(key)
+        self._pending[key] = score if old is None else log_add(old, score)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except RedisError as e:
+                log.warning("flush_failed", error=e, pending=len(self._pending))
+
+    async def flush(self) -> None:
+        if not self._pending or self.redis is None:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for (keys, member), score in batch.items():
+                    await self._script(keys=list(keys), args=[member, score, self.max_items], client=pipe)
+                await pipe.execute()
+        except RedisError:
+            for key, score in batch.items():
+                old = self._pending.get(key)
+                self._pending[key] = score if old is None else log_add(old, score)
+            raise
+
+    async def is_empty(self) -> bool:
+        """Пуст ли общий рейтинг (недоступный рейтинг засевать незачем - False)"""
+        if self.redis is None:
+            return self.local and "all" not in self._local
+        return not await self.redis.exists(self._key("all"))
+
+    async def seed(self, entries: Iterable[Tuple[str, float, Sequence[str]]]) -> int:
+        """Заполнить пустой рейтинг счётами, посчитанными по базе: (id, счёт, срезы).
+
+        Засевать стоит только пустой рейтинг (is_empty): в Redis он общий для всех
+        воркеров и переживает рестарты. ZADD GT не понижает счета, уже выросшие от
+        живых событий, и повторный засев параллельным воркером ничего не портит.
+        """
+        if not self.available:
+            return 0
+        by_scope: Dict[str, Dict[str, float]] = {}
+        for member, score, scopes in entries:
+            for scope in scopes:
+                by_scope.setdefault(scope, {})[str(member)] = score
+        if not by_scope:
+            return 0
+        if self.redis is None:
+            for scope, scores in by_scope.items():
+                local = self._local.setdefault(scope, LocalSortedSet(self.max_items))
+                for member, score in scores.items():
+                    local.add(member, score)
+            return len(by_scope.get("all", {}))
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for scope, scores in by_scope.items():
+                pipe.zadd(self._key(scope), scores, gt=True)
+                pipe.zremrangebyrank(self._key(scope), 0, -self.max_items - 1)
+            await pipe.execute()
+        return len(by_scope.get("all", {}))
+
+    async def top(self, scope: str, offset: int, limit: int) -> Optional[List[Tuple[str, float]]]:
+        """Страница рейтинга: (id, счёт) по убыванию, O(log n + limit); None - рейтинг недоступен"""
+        if self.redis is None:
+            if not self.local:
+                return None
+            local = self._local.get(scope)
+            return local.top(offset, limit) if local else []
+        try:
+            rows = await self.redis.zrevrange(self._key(scope), offset, offset + limit - 1, withscores=True)
+        except RedisError as e:
+            log.warning("top_failed", scope=scope, error=e)
+            return None
+        return [(member.decode(), score) for member, score in rows]
+
+
+trending = TrendingIndex(
+    settings.REDIS_URL,
+    half_life_hours=settings.TRENDING_HALF_LIFE_HOURS,
+    max_items=settings.TRENDING_MAX_ITEMS,
+    flush_interval_ms=settings.TRENDING_FLUSH_INTERVAL_MS,
+    # app.server записывает в WEB_WORKERS фактическое число воркеров до импорта приложения;
+    # 0 или 1 - приложение работает одним процессом (uvicorn app.main:app)
+    local=settings.WEB_WORKERS <= 1,
+)
@@ -0,0 +1,109 @@
+import asyncio
+from collections import Counter, defaultdict
+from typing import Optional
+import uuid
+
+from sqlalchemy import BigInteger, column, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.database.database import engine
+from app.core.log import get_logger
+from app.core.settings.settings import settings
+
+# Сколько строк обновлять одним UPDATE ... FROM (VALUES ...)
+FLUSH_CHUNK_SIZE = 1000
+
+log = get_logger("views").limit("flush_failed", per_second=1)
+
+
+class ViewCounterBuffer:
+    """Буфер просмотров: копит инкременты по id и сбрасывает их пачками"""
+
+    def __init__(self, engine: AsyncEngine, flush_interval_ms: int, max_pending: int):
+        self.engine = engine
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self._pending: "defaultdict[type, Counter]" = defaultdict(Counter)
+        self._pending_events = 0
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def increment(self, model: type, obj_id: uuid.UUID, delta: int = 1) -> None:
+        """Учесть просмотр без обращения к базе"""
+        self._pending[model][obj_id] += delta
+        self._pending_events += 1
+        if self._pending_events >= self.max_pending:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить фоновый сброс и дописать всё накопленное"""
+        self._stopping = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            # Остальная остановка приложения не должна зависеть от доступности базы
+            log.error("final_flush_failed", error=e, pending=self._pending_events)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                log.warning("flush_failed", error=e, pending=self._pending_events)
+
+    async def flush(self) -> None:
+        """Записать накопленные просмотры: один UPDATE на таблицу"""
+        async with self._flush_lock:
+            if not self._pending_events:
+                return
+            batch, self._pending = self._pending, defaultdict(Counter)
+            events, self._pending_events = self._pending_events, 0
+            try:
+                async with self.engine.begin() as conn:
+                    for model, deltas in batch.items():
+                        items = [(obj_id, delta) for obj_id, delta in deltas.items() if delta]
+                        for i in range(0, len(items), FLUSH_CHUNK_SIZE):
+                            await conn.execute(_views_update(model, items[i:i + FLUSH_CHUNK_SIZE]))
+            except Exception:
+                # Возвращаем несохранённые инкременты в буфер
+                for model, deltas in batch.items():
+                    self._pending[model].update(deltas)
+                self._pending_events += events
+                raise
+
+
+def _views_update(model: type, items: list):
+    v = values(
+        column("id", UUID(as_uuid=True)),
+        column("delta", BigInteger),
+        name="v",
+    ).data(items)
+    return (
+        update(model)
+        .where(model.id == v.c.id)
+        .values(views=model.views + v.c.delta)
+    )
+
+
+view_counter = ViewCounterBuffer(
+    engine,
+    flush_interval_ms=settings.VIEW_FLUSH_INTERVAL_MS,
+    max_pending=settings.VIEW_FLUSH_MAX_EVENTS,
+)
@@ -3,25 +3,76 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+from redis.exceptions import RedisError
 
-from app.core.database.database import engine
+from app.core.database.database import engine, replica_engine, read_tracker, get_pool_stats, pool_stats, replica_pool_stats
 from app.core.settings.settings import settings
+from app.core.security import password_hasher
+from app.core.auth import token_cache
+from app.core.responses import FastJSONResponse
+from app.core.view_counter import view_counter
+from app.core.cache import response_cache
+from app.core.trending import trending
+from app.core.startup import check_schema_revision, preload_cache, seed_trending, warmup
+from app.core.log import get_logger, log_output
+from app.core.metrics import Metrics, MetricsMiddleware, MetricsWriter, metrics, metrics_store
 from app.models.base import Base
 from app.routing.api_router import api_router
+from app.routing.media.media_router import router as media_router
+
+log = get_logger("startup")
 
 
 # Lifespan event handler
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    log_output.configure()
+    app.state.ready = False
+    if settings.STARTUP_MODE == "fast":
+        # Схема - забота миграций; здесь только проверка, что она на head
+        revision = await check_schema_revision(engine)
+        log.info("schema_checked", revision=revision)
+    else:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    view_counter.start()
+    await response_cache.start()
+    await read_tracker.start()
+    await trending.start()
+    metrics_store.start(worker_metrics)
+    if not trending.available:
+        # Несколько воркеров без Redis: общего рейтинга нет, sort=hot отвечает 503
+        log.warning("trending_unavailable", workers=settings.WEB_WORKERS, reason="REDIS_URL is not set")
+    try:
+        log.info("trending_seeded", videos=await seed_trending(replica_engine))
+    except RedisError as e:
+        # Без засева лента "горячих" отдаётся по просмотрам, пока рейтинг не наберётся
+        log.warning("trending_seed_failed", error=e)
+    if settings.STARTUP_MODE == "fast":
+        connections = settings.WARMUP_CONNECTIONS or settings.DB_POOL_SIZE
+        engines = [engine] if replica_engine is engine else [engine, replica_engine]
+        for warm_engine in engines:
+            elapsed = await warmup(warm_engine, connections)
+            log.info("warmed_up", host=warm_engine.url.host, elapsed_ms=round(elapsed * 1000))
+        # Рейтинг уже засеян: первая страница "горячих" тоже уходит в кэш
+        log.info("cache_preloaded", pages=await preload_cache(app, replica_engine))
+    app.state.ready = True
     yield
     # Shutdown
+    app.state.ready = False
+    await metrics_store.close()
+    await view_counter.stop()
+    await response_cache.close()
+    await read_tracker.close()
+    await trending.close()
+    password_hasher.shutdown()
     await engine.dispose()
+    log_output.stop()
 
 
 app = FastAPI(
@@ -31,6 +82,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS middleware
@@ -41,12 +93,106 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Метрики - внешним слоем, чтобы в задержку входило всё остальное
+app.add_middleware(MetricsMiddleware)
 
 # Health check endpoint (before API router to avoid conflicts)
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
+
+@app.get("/health/ready")
+async def readiness_check():
+    # Балансировщик не шлёт трафик, пока воркер не прогрет, и снимает его перед остановкой
+    if not getattr(app.state, "ready", False):
+        state = "draining" if getattr(app.state, "draining", False) else "starting"
+        return JSONResponse(status_code=503, content={"status": state})
+    return {"status": "ready"}
+
+
+@app.get("/health/db-pool")
+async def db_pool_stats():
+    return get_pool_stats()
+
+
+@app.get("/health/password-hasher")
+async def password_hasher_stats():
+    return password_hasher.snapshot()
+
+
+@app.get("/health/token-cache")
+async def token_cache_stats():
+    return token_cache.snapshot()
+
+
+@app.get("/health/logging")
+async def logging_stats():
+    return log_output.snapshot()
+
+
+# Снимки состояния воркера: имя метрики -> (описание, снимок)
+WORKER_SNAPSHOTS = {
+    "linap_password_hasher": ("bcrypt thread pool", password_hasher.snapshot),
+    "linap_token_cache": ("JWT verification cache", token_cache.snapshot),
+    "linap_log_queue": ("Background log writer", log_output.snapshot),
+}
+
+
+def _pools() -> list:
+    pools = [("primary", engine, pool_stats)]
+    if replica_engine is not engine:
+        pools.append(("replica", replica_engine, replica_pool_stats))
+    return pools
+
+
+def worker_metrics() -> dict:
+    """Метрики этого воркера в виде, который складывается по воркерам (MetricsStore)"""
+    pools = {}
+    for name, pool_engine, stats in _pools():
+        counts, total_ms = stats.checkout_histogram()
+        pools[name] = {"counts": counts, "sum": total_ms / 1000, "snapshot": stats.snapshot(pool_engine.pool)}
+    return {
+        "metrics": metrics.dump(),
+        "pools": pools,
+        "snapshots": {name: snapshot() for name, (_, snapshot) in WORKER_SNAPSHOTS.items()},
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Метрики всех воркеров в текстовом формате Prometheus.
+
+    Счётчики и гистограммы - сумма по воркерам (и уже остановленным);
+    состояние пулов и очередей - по живым воркерам, с меткой worker.
+    """
+    workers = await metrics_store.collect()
+    total = Metrics()
+    checkout: dict = {}
+    for _, alive, data in workers:
+        total.merge(data["metrics"], alive)
+        for name, pool in data["pools"].items():
+            counts, wait = checkout.get(name, ([0] * len(pool["counts"]), 0.0))
+            checkout[name] = ([a + b for a, b in zip(counts, pool["counts"])], wait + pool["sum"])
+    live = [(str(pid), data) for pid, alive, data in workers if alive]
+
+    out = MetricsWriter()
+    total.write(out)
+    out.header("linap_db_pool_checkout_wait_seconds", "histogram", "Wait for a pooled DB connection")
+    bounds = tuple(b / 1000 for b in pool_stats.buckets_ms)
+    for name, (counts, wait) in sorted(checkout.items()):
+        out.buckets("linap_db_pool_checkout_wait_seconds", bounds, counts, ("pool",), (name,))
+        out.sample("linap_db_pool_checkout_wait_seconds_sum", wait, ("pool",), (name,))
+        out.sample("linap_db_pool_checkout_wait_seconds_count", sum(counts), ("pool",), (name,))
+    out.snapshot(
+        "linap_db_pool", "DB connection pool",
+        {(name, pid): pool["snapshot"] for pid, data in live for name, pool in data["pools"].items()},
+        ("pool", "worker")
+    )
+    for metric, (help_text, _) in WORKER_SNAPSHOTS.items():
+        out.snapshot(metric, help_text, {(pid,): data["snapshots"][metric] for pid, data in live}, ("worker",))
+    return PlainTextResponse(out.render(), media_type="text/plain; version=0.0.4")
+
 # Include API router
 app.include_router(api_router)
 
@@ -54,6 +200,9 @@ app.include_router(api_router)
 FRONT_DIR = Path(__file__).parent.parent / "front"
 app.mount("/static", StaticFiles(directory=str(FRONT_DIR)), name="static")
 
+# Video delivery with range requests (must be before the /uploads mount)
+app.include_router(media_router, tags=["Media"])
+
 # Mount uploads directory
 UPLOADS_DIR = Path(__file__).parent.parent / "uploads"
 UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
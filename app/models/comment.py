@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Text, Boolean, DateTime, func, Index, text, ForeignKey
+from sqlalchemy import Text, Boolean, Integer, DateTime, func, Index, text, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -13,7 +13,16 @@ from .base import Base
 
 class Comment(Base):
     __tablename__ = "comments"
-    __table_args__ = (Index("idx_comments_post", "post_id"), {"schema": "linap"})
+    __table_args__ = (
+        Index("idx_comments_post_created", "post_id", "created_at", "id"),
+        Index("idx_comments_user_created", "user_id", "created_at", "id"),
+        Index("idx_comments_post_path", "post_id", "path"),
+        Index(
+            "idx_comments_post_roots", "post_id", "created_at", "id",
+            postgresql_where=text("parent_id IS NULL"),
+        ),
+        {"schema": "linap"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("linap.users.id"))
@@ -23,3 +32,10 @@ class Comment(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
     is_deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=text('false'))
+    likes: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    dislikes: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    # Материализованный путь: ключи предков через "." - поддерево = диапазон по path.
+    # Сортировка "C" побайтовая, поэтому порядок path = порядок обхода дерева.
+    path: Mapped[str] = mapped_column(Text(collation="C"), nullable=False)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    reply_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Integer, DateTime, func, Index, text, ForeignKey
+from sqlalchemy import Integer, DateTime, func, Index, text, ForeignKey, UniqueConstraint
 from sqlalchemy import Enum as SAEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
@@ -15,11 +15,26 @@ LikeTarget = SAEnum("post", "video", "comment", name="like_target", schema="lina
 
 class Like(Base):
     __tablename__ = "likes"
-    __table_args__ = (Index("idx_likes_target", "target_type", "target_id"), {"schema": "linap"})
+    __table_args__ = (
+        # Списки реакций читают только действующие (value <> 0) строки журнала
+        Index(
+            "idx_likes_target_active", "target_type", "target_id", "created_at", "id",
+            postgresql_where=text("value <> 0"),
+        ),
+        Index(
+            "idx_likes_user_active", "user_id", "created_at", "id",
+            postgresql_where=text("value <> 0"),
+        ),
+        UniqueConstraint("user_id", "target_type", "target_id", name="uq_likes_user_target"),
+        {"schema": "linap"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("linap.users.id"))
     target_type: Mapped[str] = mapped_column(LikeTarget, nullable=False)
     target_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    # 1 - лайк, -1 - дизлайк, 0 - реакция снята
     value: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Значение до последнего изменения - нужно для пересчёта агрегатов
+    prev_value: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
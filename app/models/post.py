@@ -4,9 +4,9 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import String, Text, Boolean, BigInteger, DateTime, func, text, Index, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship, foreign
+from sqlalchemy import String, Text, Boolean, BigInteger, Integer, DateTime, func, text, Index, ForeignKey, Computed
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR, ARRAY
+from sqlalchemy.orm import Mapped, mapped_column, relationship, foreign, query_expression
 
 from .base import Base
 
@@ -15,7 +15,13 @@ from .base import Base
 
 class Post(Base):
     __tablename__ = "posts"
-    __table_args__ = (Index("idx_posts_owner", "owner_id"), {"schema": "linap"})
+    __table_args__ = (
+        Index("idx_posts_owner_created", "owner_id", "created_at", "id"),
+        Index("idx_posts_published_created", "published", "created_at", "id"),
+        Index("idx_posts_search", "search_vector", postgresql_using="gin"),
+        Index("idx_posts_tag_slugs", "tag_slugs", postgresql_using="gin"),
+        {"schema": "linap"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     owner_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("linap.users.id"))
@@ -29,6 +35,24 @@ class Post(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
     published: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=text('false'))
     views: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text('0'))
+    likes: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    dislikes: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    # Число неудалённых комментариев, ведётся в CommentService
+    comment_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    # Копия slug тегов из post_tags: фильтр по тегам без join
+    tag_slugs: Mapped[List[str]] = mapped_column(ARRAY(String(64)), nullable=False, server_default=text("'{}'"))
+    # Поисковый вектор считает сама БД при каждой записи строки
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(excerpt, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(content, '')), 'C')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+    search_rank: Mapped[Optional[float]] = query_expression()
 
     owner = relationship("User", back_populates="posts", foreign_keys=[owner_id])
     tags: Mapped[List["Tag"]] = relationship("Tag", secondary="linap.post_tags", viewonly=True)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import uuid
-from sqlalchemy import String, Text, text
+from sqlalchemy import String, Text, Integer, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -15,3 +15,6 @@ class Tag(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     name: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
     slug: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    # Число опубликованных постов с этим тегом - то же, что считают фасеты и лента.
+    # Ведётся инкрементально при изменении тегов и публикации/снятии поста
+    post_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
@@ -4,15 +4,22 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Text, Boolean, BigInteger, Integer, DateTime, func, text, Index, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Text, Boolean, BigInteger, Integer, DateTime, func, text, Index, ForeignKey, Computed
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column, relationship, query_expression
 
 from .base import Base
 
 class Video(Base):
     __tablename__ = "videos"
-    __table_args__ = (Index("idx_videos_owner", "owner_id"), {"schema": "linap"})
+    __table_args__ = (
+        Index("idx_videos_owner_created", "owner_id", "created_at", "id"),
+        Index("idx_videos_published_created", "published", "created_at", "id"),
+        Index("idx_videos_agent_views", "agent", "views", "id"),
+        Index("idx_videos_map_views", "map_id", "views", "id"),
+        Index("idx_videos_search", "search_vector", postgresql_using="gin"),
+        {"schema": "linap"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     owner_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("linap.users.id"))
@@ -29,5 +36,17 @@ class Video(Base):
     likes: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
     dislikes: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
     published: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=text('true'))
+    # Поисковый вектор считает сама БД при каждой записи строки
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+    search_rank: Mapped[Optional[float]] = query_expression()
 
     owner = relationship("User", back_populates="videos", foreign_keys=[owner_id])
+    map = relationship("Map", foreign_keys=[map_id])
@@ -6,6 +6,7 @@ from app.routing.videos.video_router import router as video_router
 from app.routing.tags.tag_router import router as tag_router
 from app.routing.likes.like_router import router as like_router
 from app.routing.comments.comment_router import router as comment_router
+from app.routing.search.search_router import router as search_router
 
 # Создаем главный роутер с префиксом /api/v1
 api_router = APIRouter(prefix="/api/v1")
@@ -18,3 +19,4 @@ api_router.include_router(video_router, tags=["Videos"])
 api_router.include_router(tag_router, tags=["Tags"])
 api_router.include_router(like_router, tags=["Likes"])
 api_router.include_router(comment_router, tags=["Comments"])
+api_router.include_router(search_router, tags=["Search"])
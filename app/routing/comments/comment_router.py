@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.core.database.database import get_db
+from app.core.database.database import get_db, get_read_db
+from app.core.responses import schema_response
+from app.core.fields import parse_fields
+from app.core.auth import get_current_user
+from app.core.security import TokenData
 from app.service.comment_service import CommentService
+from app.schemas.comment import CommentPage, CommentResponse, CommentTree
 
 router = APIRouter(prefix="/comments")
 
@@ -11,7 +16,7 @@ router = APIRouter(prefix="/comments")
 @router.get("/{comment_id}")
 async def get_comment(
     comment_id: UUID,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить комментарий по ID"""
     comment_service = CommentService(session)
@@ -22,7 +27,7 @@ async def get_comment(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Comment not found"
             )
-        return comment
+        return schema_response(CommentResponse, comment)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -35,15 +40,41 @@ async def get_comment(
 @router.get("/post/{post_id}")
 async def get_post_comments(
     post_id: UUID,
-    skip: int = 0,
-    limit: int = 50,
-    session: AsyncSession = Depends(get_db)
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=100),
+    fields: str | None = None,
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить комментарии поста"""
     comment_service = CommentService(session)
     try:
-        comments = await comment_service.get_post_comments(post_id, skip, limit)
-        return {"comments": comments, "count": len(comments)}
+        selection = parse_fields(fields, CommentResponse)
+        comments, next_cursor = await comment_service.get_post_comments(post_id, cursor, limit, selection)
+        return schema_response(CommentPage, {"comments": comments, "count": len(comments), "next_cursor": next_cursor}, fields=selection)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/post/{post_id}/tree")
+async def get_comment_tree(
+    post_id: UUID,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    max_depth: int = Query(3, ge=0, le=20),
+    session: AsyncSession = Depends(get_read_db)
+):
+    """Получить ветки комментариев поста; ответы глубже max_depth свёрнуты в reply_count"""
+    comment_service = CommentService(session)
+    try:
+        comments, next_cursor = await comment_service.get_comment_tree(post_id, cursor, limit, max_depth)
+        return schema_response(CommentTree, CommentTree.from_rows(comments, next_cursor))
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -54,15 +85,19 @@ async def get_post_comments(
 @router.get("/user/{user_id}")
 async def get_user_comments(
     user_id: UUID,
-    skip: int = 0,
-    limit: int = 50,
-    session: AsyncSession = Depends(get_db)
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=100),
+    fields: str | None = None,
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить комментарии пользователя"""
     comment_service = CommentService(session)
     try:
-        comments = await comment_service.get_user_comments(user_id, skip, limit)
-        return {"comments": comments, "count": len(comments)}
+        selection = parse_fields(fields, CommentResponse)
+        comments, next_cursor = await comment_service.get_user_comments(user_id, cursor, limit, selection)
+        return schema_response(CommentPage, {"comments": comments, "count": len(comments), "next_cursor": next_cursor}, fields=selection)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -73,21 +108,23 @@ async def get_user_comments(
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_comment(
     post_id: UUID,
-    author_id: UUID,
     content: str,
     parent_id: UUID | None = None,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user)
 ):
-    """Создать новый комментарий"""
+    """Создать новый комментарий (ответ - с parent_id)"""
     comment_service = CommentService(session)
     try:
         comment = await comment_service.create_comment(
             post_id=post_id,
-            author_id=author_id,
+            user_id=UUID(current_user.user_id),
             content=content,
             parent_id=parent_id
         )
-        return {"message": "Comment created successfully", "comment": comment}
+        return {"message": "Comment created successfully", "comment": CommentResponse.model_validate(comment)}
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
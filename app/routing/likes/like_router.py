@@ -1,25 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.core.database.database import get_db
-from app.service.like_service import LikeService
+from app.core.auth import get_current_user
+from app.core.database.database import get_db, get_read_db
+from app.core.responses import schema_response
+from app.service.reaction_service import ReactionService
+from app.schemas.like import LikePage
 
 router = APIRouter(prefix="/likes")
 
 
-@router.get("/post/{post_id}")
-async def get_post_likes(
-    post_id: UUID,
-    skip: int = 0,
-    limit: int = 100,
-    session: AsyncSession = Depends(get_db)
+@router.get("/user/{user_id}")
+async def get_user_likes(
+    user_id: UUID,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=100),
+    session: AsyncSession = Depends(get_read_db)
 ):
-    """Получить лайки поста"""
-    like_service = LikeService(session)
+    """Получить лайки пользователя"""
+    reaction_service = ReactionService(session)
     try:
-        likes = await like_service.get_post_likes(post_id, skip, limit)
-        return {"likes": likes, "count": len(likes)}
+        likes, next_cursor = await reaction_service.get_user_likes(user_id, cursor, limit)
+        return schema_response(LikePage, {"likes": likes, "count": len(likes), "next_cursor": next_cursor})
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -27,18 +32,21 @@ async def get_post_likes(
         )
 
 
-@router.get("/user/{user_id}")
-async def get_user_likes(
-    user_id: UUID,
-    skip: int = 0,
-    limit: int = 100,
-    session: AsyncSession = Depends(get_db)
+@router.get("/{target_type}/{target_id}")
+async def get_target_likes(
+    target_type: str,
+    target_id: UUID,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=100),
+    session: AsyncSession = Depends(get_read_db)
 ):
-    """Получить лайки пользователя"""
-    like_service = LikeService(session)
+    """Получить лайки поста, видео или комментария"""
+    reaction_service = ReactionService(session)
     try:
-        likes = await like_service.get_user_likes(user_id, skip, limit)
-        return {"likes": likes, "count": len(likes)}
+        likes, next_cursor = await reaction_service.get_target_likes(target_type, target_id, cursor, limit)
+        return schema_response(LikePage, {"likes": likes, "count": len(likes), "next_cursor": next_cursor})
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -46,17 +54,20 @@ async def get_user_likes(
         )
 
 
-@router.post("/post/{post_id}")
-async def like_post(
-    post_id: UUID,
-    user_id: UUID,
-    session: AsyncSession = Depends(get_db)
+@router.post("/{target_type}/{target_id}")
+async def react(
+    target_type: str,
+    target_id: UUID,
+    value: int = 1,
+    toggle: bool = False,
+    session: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
 ):
-    """Поставить лайк на пост"""
-    like_service = LikeService(session)
+    """Поставить лайк (value=1) или дизлайк (value=-1)"""
+    reaction_service = ReactionService(session)
     try:
-        like = await like_service.like_post(user_id, post_id)
-        return {"message": "Post liked successfully", "like": like}
+        reaction = await reaction_service.react(UUID(current_user.user_id), target_type, target_id, value, toggle)
+        return {"message": "Reaction saved successfully", **reaction}
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -66,17 +77,18 @@ async def like_post(
         )
 
 
-@router.delete("/post/{post_id}")
-async def unlike_post(
-    post_id: UUID,
-    user_id: UUID,
-    session: AsyncSession = Depends(get_db)
+@router.delete("/{target_type}/{target_id}")
+async def remove_reaction(
+    target_type: str,
+    target_id: UUID,
+    session: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
 ):
-    """Удалить лайк с поста"""
-    like_service = LikeService(session)
+    """Снять реакцию"""
+    reaction_service = ReactionService(session)
     try:
-        await like_service.unlike_post(user_id, post_id)
-        return {"message": "Like removed successfully"}
+        reaction = await reaction_service.remove_reaction(UUID(current_user.user_id), target_type, target_id)
+        return {"message": "Like removed successfully", **reaction}
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from pathlib import Path
+
+from app.core.settings.settings import settings
+from app.core.streaming import VideoFileResponse
+
+router = APIRouter()
+
+VIDEOS_DIR = (Path(__file__).parent.parent.parent.parent / "uploads" / "videos").resolve()
+
+
+@router.api_route("/uploads/videos/{filename}", methods=["GET", "HEAD"])
+async def stream_video(filename: str, request: Request):
+    """Отдать видеофайл с поддержкой Range и условных запросов"""
+    path = (VIDEOS_DIR / filename).resolve()
+    if path.parent != VIDEOS_DIR:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video not found"
+        )
+    try:
+        stat = path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video not found"
+        )
+
+    return VideoFileResponse(
+        str(path),
+        stat,
+        request.headers,
+        method=request.method,
+        chunk_size=settings.VIDEO_STREAM_CHUNK_BYTES,
+        rate_limit=settings.VIDEO_STREAM_RATE_LIMIT,
+    )
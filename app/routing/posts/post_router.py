@@ -1,17 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.core.database.database import get_db
+from app.core.database.database import get_db, get_read_db
+from app.core.responses import schema_response
+from app.core.fields import parse_fields
+from app.core.cache import cached
+from app.core.loader import parse_ids
+from app.core.settings.settings import settings
 from app.service.post_service import PostService
+from app.service.loaders import RequestLoaders, get_loaders
+from app.schemas.post import PostBatch, PostPage, PostResponse
 
 router = APIRouter(prefix="/posts")
 
 
+def _split_tags(tags: str | None) -> list[str]:
+    return list(dict.fromkeys(t.strip().lower() for t in (tags or "").split(",") if t.strip()))
+
+
+@router.get("/batch")
+async def get_posts_batch(
+    ids: str,
+    loaders: RequestLoaders = Depends(get_loaders)
+):
+    """Получить посты по списку id (ids=a,b,c) одним запросом"""
+    try:
+        post_ids = parse_ids(ids, settings.BATCH_MAX_IDS)
+        posts = await loaders.posts.load_many(post_ids)
+        return schema_response(PostBatch, {
+            "posts": [post for post in posts if post is not None],
+            "missing": [i for i, post in zip(post_ids, posts) if post is None],
+        })
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
 @router.get("/{post_id}")
 async def get_post(
     post_id: UUID,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить пост по ID"""
     post_service = PostService(session)
@@ -22,7 +57,7 @@ async def get_post(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Post not found"
             )
-        return post
+        return schema_response(PostResponse, post)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -35,7 +70,7 @@ async def get_post(
 @router.get("/slug/{slug}")
 async def get_post_by_slug(
     slug: str,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить пост по slug"""
     post_service = PostService(session)
@@ -48,7 +83,7 @@ async def get_post_by_slug(
             )
         # Увеличиваем количество просмотров
         await post_service.increment_views(post.id)
-        return post
+        return schema_response(PostResponse, post)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -61,15 +96,19 @@ async def get_post_by_slug(
 @router.get("/user/{user_id}")
 async def get_user_posts(
     user_id: UUID,
-    skip: int = 0,
-    limit: int = 20,
-    session: AsyncSession = Depends(get_db)
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    fields: str | None = None,
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить посты пользователя"""
     post_service = PostService(session)
     try:
-        posts = await post_service.get_user_posts(user_id, skip, limit)
-        return {"posts": posts, "count": len(posts)}
+        selection = parse_fields(fields, PostResponse)
+        posts, next_cursor = await post_service.get_user_posts(user_id, cursor, limit, selection)
+        return schema_response(PostPage, {"posts": posts, "count": len(posts), "next_cursor": next_cursor}, fields=selection)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -78,16 +117,32 @@ async def get_user_posts(
 
 
 @router.get("/")
+@cached("posts")
 async def get_published_posts(
-    skip: int = 0,
-    limit: int = 20,
-    session: AsyncSession = Depends(get_db)
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    fields: str | None = None,
+    tags: str | None = None,
+    match: Literal["all", "any"] = "all",
+    session: AsyncSession = Depends(get_read_db)
 ):
-    """Получить опубликованные посты"""
+    """Получить опубликованные посты; tags=a,b - фильтр по тегам (match=all|any)"""
     post_service = PostService(session)
     try:
-        posts = await post_service.get_published_posts(skip, limit)
-        return {"posts": posts, "count": len(posts)}
+        selection = parse_fields(fields, PostResponse)
+        tag_slugs = _split_tags(tags)
+        posts, next_cursor = await post_service.get_published_posts(
+            cursor, limit, selection, tag_slugs, match == "all"
+        )
+        # Фасеты нужны один раз на выдачу, а не на каждую страницу
+        facets = None if cursor else await post_service.get_tag_facets(tag_slugs, match == "all")
+        return schema_response(
+            PostPage,
+            {"posts": posts, "count": len(posts), "next_cursor": next_cursor, "facets": facets},
+            fields=selection
+        )
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -157,6 +212,26 @@ async def update_post(
         )
 
 
+@router.put("/{post_id}/tags")
+async def set_post_tags(
+    post_id: UUID,
+    tags: str = "",
+    session: AsyncSession = Depends(get_db)
+):
+    """Заменить теги поста (tags=a,b - slug тегов, пусто - снять все)"""
+    post_service = PostService(session)
+    try:
+        post = await post_service.set_post_tags(post_id, _split_tags(tags))
+        return schema_response(PostResponse, post)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
 @router.put("/{post_id}/publish")
 async def publish_post(
     post_id: UUID,
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database.database import get_read_db
+from app.core.responses import schema_response
+from app.core.cache import cached
+from app.service.search_service import SearchService
+from app.schemas.video import VideoPage
+from app.schemas.post import PostPage
+
+router = APIRouter(prefix="/search")
+
+
+@router.get("/videos")
+@cached("videos")
+async def search_videos(
+    q: str,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_read_db)
+):
+    """Полнотекстовый поиск видео по названию и описанию"""
+    search_service = SearchService(session)
+    try:
+        videos, next_cursor = await search_service.search_videos(q, cursor, limit)
+        return schema_response(VideoPage, {"videos": videos, "count": len(videos), "next_cursor": next_cursor})
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/posts")
+@cached("posts")
+async def search_posts(
+    q: str,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_read_db)
+):
+    """Полнотекстовый поиск постов по заголовку, анонсу и тексту"""
+    search_service = SearchService(session)
+    try:
+        posts, next_cursor = await search_service.search_posts(q, cursor, limit)
+        return schema_response(PostPage, {"posts": posts, "count": len(posts), "next_cursor": next_cursor})
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
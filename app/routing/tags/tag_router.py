@@ -1,24 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.core.database.database import get_db
+from app.core.database.database import get_db, get_read_db
+from app.core.responses import schema_response
+from app.core.cache import cached
 from app.service.tag_service import TagService
+from app.schemas.tag import TagPage, TagResponse
 
 router = APIRouter(prefix="/tags")
 
 
 @router.get("/")
+@cached("tags")
 async def get_all_tags(
-    skip: int = 0,
-    limit: int = 100,
-    session: AsyncSession = Depends(get_db)
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=100),
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить все теги"""
     tag_service = TagService(session)
     try:
-        tags = await tag_service.get_all_tags(skip, limit)
-        return {"tags": tags, "count": len(tags)}
+        tags, next_cursor = await tag_service.get_all_tags(cursor, limit)
+        return schema_response(TagPage, {"tags": tags, "count": len(tags), "next_cursor": next_cursor})
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -29,7 +35,7 @@ async def get_all_tags(
 @router.get("/{tag_id}")
 async def get_tag(
     tag_id: UUID,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить тег по ID"""
     tag_service = TagService(session)
@@ -40,7 +46,7 @@ async def get_tag(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Tag not found"
             )
-        return tag
+        return schema_response(TagResponse, tag)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -53,7 +59,7 @@ async def get_tag(
 @router.get("/name/{name}")
 async def get_tag_by_name(
     name: str,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить тег по имени"""
     tag_service = TagService(session)
@@ -64,7 +70,7 @@ async def get_tag_by_name(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Tag not found"
             )
-        return tag
+        return schema_response(TagResponse, tag)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -5,18 +5,45 @@ import aiofiles
 import os
 from pathlib import Path
 
-from app.core.database.database import get_db
+from app.core.database.database import get_db, get_read_db
+from app.core.responses import schema_response
+from app.core.loader import parse_ids
+from app.core.settings.settings import settings
 from app.service.user_service import UserService
+from app.service.loaders import RequestLoaders, get_loaders
 from app.service.auth_service import AuthService
 from app.models.user import User
+from app.schemas.user import UserBatch
 
 router = APIRouter(prefix="/users")
 
 
+@router.get("/batch")
+async def get_users_batch(
+    ids: str,
+    loaders: RequestLoaders = Depends(get_loaders)
+):
+    """Получить пользователей по списку id (ids=a,b,c) одним запросом"""
+    try:
+        user_ids = parse_ids(ids, settings.BATCH_MAX_IDS)
+        users = await loaders.users.load_many(user_ids)
+        return schema_response(UserBatch, {
+            "users": [user for user in users if user is not None],
+            "missing": [i for i, user in zip(user_ids, users) if user is None],
+        })
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
 @router.get("/{user_id}", response_model=dict)
 async def get_user(
     user_id: UUID,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить пользователя по ID"""
     user_service = UserService(session)
@@ -40,7 +67,7 @@ async def get_user(
 @router.get("/username/{username}", response_model=dict)
 async def get_user_by_username(
     username: str,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить пользователя по username"""
     user_service = UserService(session)
@@ -1,83 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Header, Form
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Header, Form, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 import aiofiles
-import os
 from pathlib import Path
-from typing import Optional
 
-from app.core.database.database import get_db
-from app.core.security import decode_access_token
+from app.core.database.database import get_db, get_read_db
+from app.core.responses import schema_response
+from app.core.fields import parse_fields
+from app.core.cache import cached
+from app.core.auth import get_current_user
+from app.core.loader import parse_ids
+from app.core.log import get_logger
+from app.core.settings.settings import settings
 from app.service.video_service import VideoService
+from app.service.reaction_service import ReactionService
+from app.service.upload_service import UploadService, video_filename, video_path
+from app.service.loaders import RequestLoaders, get_loaders
+from app.schemas.video import VideoUploadCreate, VideoBatch, VideoPage, VideoResponse
 
 router = APIRouter(prefix="/videos")
+log = get_logger("videos")
 
-
-def get_current_user(authorization: Optional[str] = Header(None)) -> dict:
-    """Получить текущего пользователя из токена"""
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    token = authorization.split(" ")[1]
-    token_data = decode_access_token(token)
-
-    if not token_data:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    return token_data
+UPLOAD_COPY_CHUNK = 1024 * 1024
 
 
 @router.get("/")
+@cached("videos")
 async def get_all_videos(
-    skip: int = 0,
-    limit: int = 20,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    fields: str | None = None,
     published: bool = True,
-    session: AsyncSession = Depends(get_db)
+    sort: Literal["new", "hot"] = "new",
+    session: AsyncSession = Depends(get_read_db)
 ):
-    """Получить список всех видео"""
+    """Получить список всех видео (sort=hot - сначала "горячие")"""
     video_service = VideoService(session)
     try:
-        # Используем метод get_user_videos с None для получения всех видео
-        # Или можно создать отдельный метод в сервисе
-        from sqlalchemy import select
-        from app.models.video import Video
-        
-        query = select(Video).where(Video.published == published)
-        query = query.offset(skip).limit(limit).order_by(Video.created_at.desc())
-        
-        result = await session.execute(query)
-        videos = result.scalars().all()
-        
-        video_list = []
-        for video in videos:
-            video_dict = {
-                "id": str(video.id),
-                "owner_id": str(video.owner_id) if video.owner_id else None,
-                "title": video.title,
-                "description": video.description,
-                "map_id": str(video.map_id) if video.map_id else None,
-                "agent": video.agent,
-                "side": video.side,
-                "video_url": video.video_url,
-                "thumbnail_url": video.thumb_url,
-                "views": video.views,
-                "likes": video.likes,
-                "dislikes": video.dislikes,
-                "published": video.published,
-                "created_at": video.created_at.isoformat() if video.created_at else None,
-                "updated_at": video.updated_at.isoformat() if video.updated_at else None
-            }
-            video_list.append(video_dict)
-        
-        return video_list
+        selection = parse_fields(fields, VideoResponse)
+        if sort == "hot":
+            videos, next_cursor = await video_service.get_hot_videos(cursor, limit, selection)
+        else:
+            videos, next_cursor = await video_service.get_videos(published, cursor, limit, selection)
+        return schema_response(VideoPage, {"videos": videos, "count": len(videos), "next_cursor": next_cursor}, fields=selection)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/batch")
+async def get_videos_batch(
+    ids: str,
+    loaders: RequestLoaders = Depends(get_loaders)
+):
+    """Получить видео по списку id (ids=a,b,c) одним запросом"""
+    try:
+        video_ids = parse_ids(ids, settings.BATCH_MAX_IDS)
+        videos = await loaders.videos.load_many(video_ids)
+        return schema_response(VideoBatch, {
+            "videos": [video for video in videos if video is not None],
+            "missing": [i for i, video in zip(video_ids, videos) if video is None],
+        })
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -88,7 +79,7 @@ async def get_all_videos(
 @router.get("/{video_id}")
 async def get_video(
     video_id: UUID,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить видео по ID"""
     video_service = VideoService(session)
@@ -99,8 +90,8 @@ async def get_video(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Video not found"
             )
-        await video_service.increment_views(video_id)
-        return video
+        await video_service.increment_views(video)
+        return schema_response(VideoResponse, video)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -113,15 +104,19 @@ async def get_video(
 @router.get("/user/{user_id}")
 async def get_user_videos(
     user_id: UUID,
-    skip: int = 0,
-    limit: int = 20,
-    session: AsyncSession = Depends(get_db)
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    fields: str | None = None,
+    session: AsyncSession = Depends(get_read_db)
 ):
     """Получить видео пользователя"""
     video_service = VideoService(session)
     try:
-        videos = await video_service.get_user_videos(user_id, skip, limit)
-        return {"videos": videos, "count": len(videos)}
+        selection = parse_fields(fields, VideoResponse)
+        videos, next_cursor = await video_service.get_user_videos(user_id, cursor, limit, selection)
+        return schema_response(VideoPage, {"videos": videos, "count": len(videos), "next_cursor": next_cursor}, fields=selection)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -130,17 +125,26 @@ async def get_user_videos(
 
 
 @router.get("/agent/{agent}")
+@cached("videos")
 async def get_videos_by_agent(
     agent: str,
-    skip: int = 0,
-    limit: int = 20,
-    session: AsyncSession = Depends(get_db)
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    fields: str | None = None,
+    sort: Literal["views", "hot"] = "views",
+    session: AsyncSession = Depends(get_read_db)
 ):
-    """Получить видео по агенту"""
+    """Получить видео по агенту (sort=hot - сначала "горячие")"""
     video_service = VideoService(session)
     try:
-        videos = await video_service.get_videos_by_agent(agent, skip, limit)
-        return {"videos": videos, "count": len(videos)}
+        selection = parse_fields(fields, VideoResponse)
+        if sort == "hot":
+            videos, next_cursor = await video_service.get_hot_videos(cursor, limit, selection, agent=agent)
+        else:
+            videos, next_cursor = await video_service.get_videos_by_agent(agent, cursor, limit, selection)
+        return schema_response(VideoPage, {"videos": videos, "count": len(videos), "next_cursor": next_cursor}, fields=selection)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -149,17 +153,26 @@ async def get_videos_by_agent(
 
 
 @router.get("/map/{map_id}")
+@cached("videos")
 async def get_videos_by_map(
     map_id: UUID,
-    skip: int = 0,
-    limit: int = 20,
-    session: AsyncSession = Depends(get_db)
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    fields: str | None = None,
+    sort: Literal["views", "hot"] = "views",
+    session: AsyncSession = Depends(get_read_db)
 ):
-    """Получить видео по карте"""
+    """Получить видео по карте (sort=hot - сначала "горячие")"""
     video_service = VideoService(session)
     try:
-        videos = await video_service.get_videos_by_map(map_id, skip, limit)
-        return {"videos": videos, "count": len(videos)}
+        selection = parse_fields(fields, VideoResponse)
+        if sort == "hot":
+            videos, next_cursor = await video_service.get_hot_videos(cursor, limit, selection, map_id=map_id)
+        else:
+            videos, next_cursor = await video_service.get_videos_by_map(map_id, cursor, limit, selection)
+        return schema_response(VideoPage, {"videos": videos, "count": len(videos), "next_cursor": next_cursor}, fields=selection)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -232,13 +245,14 @@ async def update_video(
 @router.post("/{video_id}/like")
 async def like_video(
     video_id: UUID,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
 ):
-    """Добавить лайк к видео"""
-    video_service = VideoService(session)
+    """Поставить или снять лайк видео"""
+    reaction_service = ReactionService(session)
     try:
-        video = await video_service.like_video(video_id)
-        return {"message": "Video liked successfully", "likes": video.likes}
+        reaction = await reaction_service.react(UUID(current_user.user_id), "video", video_id, 1)
+        return {"message": "Video liked successfully", **reaction}
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -251,13 +265,14 @@ async def like_video(
 @router.post("/{video_id}/dislike")
 async def dislike_video(
     video_id: UUID,
-    session: AsyncSession = Depends(get_db)
+    session: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
 ):
-    """Добавить дизлайк к видео"""
-    video_service = VideoService(session)
+    """Поставить или снять дизлайк видео"""
+    reaction_service = ReactionService(session)
     try:
-        video = await video_service.dislike_video(video_id)
-        return {"message": "Video disliked successfully", "dislikes": video.dislikes}
+        reaction = await reaction_service.react(UUID(current_user.user_id), "video", video_id, -1)
+        return {"message": "Video disliked successfully", **reaction}
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -280,8 +295,6 @@ async def upload_video(
     """Загрузить видео файл"""
     video_service = VideoService(session)
     try:
-        print(f"[VIDEO UPLOAD] Received upload request: title={title}, agent={agent}, side={side}, user={current_user}")
-        
         # Get owner_id from current user (TokenData object)
         owner_id = UUID(current_user.user_id)
         
@@ -293,19 +306,17 @@ async def upload_video(
             )
         
         # Создаем директорию для видео если её нет
-        upload_dir = "uploads/videos"
-        Path(upload_dir).mkdir(parents=True, exist_ok=True)
+        upload_dir = Path("uploads/videos")
+        upload_dir.mkdir(parents=True, exist_ok=True)
         
         # Генерируем имя файла
-        file_extension = file.filename.split(".")[-1] if file.filename else "mp4"
-        unique_id = os.urandom(8).hex()
-        filename = f"{title.replace(' ', '_')}_{unique_id}.{file_extension}"
-        filepath = os.path.join(upload_dir, filename)
+        filename = video_filename(title, file.filename)
+        filepath = video_path(upload_dir, filename)
         
-        # Сохраняем файл
+        # Сохраняем файл частями, не держа его целиком в памяти
         async with aiofiles.open(filepath, "wb") as f:
-            contents = await file.read()
-            await f.write(contents)
+            while chunk := await file.read(UPLOAD_COPY_CHUNK):
+                await f.write(chunk)
         
         # Создаем видео в БД
         video_url = f"/uploads/videos/{filename}"
@@ -318,7 +329,7 @@ async def upload_video(
             side=side
         )
         
-        print(f"[VIDEO UPLOAD] Video created: {video}")
+        log.info("video_uploaded", video_id=video.id, owner_id=owner_id, content_type=file.content_type)
         
         return {
             "message": "Video uploaded successfully",
@@ -328,9 +339,104 @@ async def upload_video(
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"[VIDEO UPLOAD] Error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("video_upload_failed", title=title)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post("/uploads", status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    request: VideoUploadCreate,
+    session: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Начать возобновляемую загрузку видео"""
+    upload_service = UploadService(session)
+    try:
+        return await upload_service.create_upload(
+            owner_id=UUID(current_user.user_id),
+            title=request.title,
+            size=request.size,
+            filename=request.filename,
+            content_type=request.content_type,
+            description=request.description,
+            agent=request.agent,
+            side=request.side
+        )
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/uploads/{upload_id}")
+async def get_upload(
+    upload_id: UUID,
+    session: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Узнать, сколько байт загрузки уже получено"""
+    upload_service = UploadService(session)
+    try:
+        return await upload_service.get_upload(upload_id, UUID(current_user.user_id))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.patch("/uploads/{upload_id}")
+async def upload_chunk(
+    upload_id: UUID,
+    request: Request,
+    upload_offset: int = Header(...),
+    session: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Дописать часть файла (тело запроса) с позиции Upload-Offset"""
+    upload_service = UploadService(session)
+    try:
+        return await upload_service.append_chunk(
+            upload_id,
+            UUID(current_user.user_id),
+            upload_offset,
+            request.stream()
+        )
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post("/uploads/{upload_id}/finalize", status_code=status.HTTP_201_CREATED)
+async def finalize_upload(
+    upload_id: UUID,
+    session: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Завершить загрузку и создать видео"""
+    upload_service = UploadService(session)
+    try:
+        video = await upload_service.finalize(upload_id, UUID(current_user.user_id))
+        return {
+            "message": "Video uploaded successfully",
+            "video": video,
+            "video_url": video.video_url
+        }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
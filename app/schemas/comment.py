@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from datetime import datetime
 from uuid import UUID
+from typing import List, Optional
 
 
 class CommentCreate(BaseModel):
@@ -14,10 +15,50 @@ class CommentUpdate(BaseModel):
 
 class CommentResponse(BaseModel):
     id: UUID
-    post_id: UUID
-    author_id: UUID
+    post_id: Optional[UUID]
+    user_id: Optional[UUID]
+    parent_id: Optional[UUID] = None
     content: str
+    likes: int = 0
+    dislikes: int = 0
+    is_deleted: bool = False
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+
+class CommentPage(BaseModel):
+    comments: List[CommentResponse]
+    count: int
+    next_cursor: Optional[str] = None
+
+
+class CommentNode(CommentResponse):
+    depth: int = 0
+    reply_count: int = 0
+    replies: List["CommentNode"] = []
+
+
+class CommentTree(BaseModel):
+    comments: List[CommentNode]
+    count: int
+    next_cursor: Optional[str] = None
+
+    @classmethod
+    def from_rows(cls, rows, next_cursor: Optional[str] = None) -> "CommentTree":
+        """Собрать дерево из строк в порядке обхода (родитель раньше детей)"""
+        nodes = {}
+        roots = []
+        for row in rows:
+            node = CommentNode.model_validate(row)
+            nodes[node.id] = node
+            parent = nodes.get(node.parent_id)
+            if parent is not None:
+                parent.replies.append(node)
+            else:
+                roots.append(node)
+        # Внутри ветки ответы по времени, сами ветки - новые сверху
+        roots.reverse()
+        return cls(comments=roots, count=len(roots), next_cursor=next_cursor)
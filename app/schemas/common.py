@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from uuid import UUID
+from typing import Optional
+
+
+class UserSummary(BaseModel):
+    id: UUID
+    username: str
+    avatar_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class MapSummary(BaseModel):
+    id: UUID
+    name: str
+    slug: str
+
+    class Config:
+        from_attributes = True
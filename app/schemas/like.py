@@ -1,13 +1,23 @@
 from pydantic import BaseModel
 from datetime import datetime
 from uuid import UUID
+from typing import List, Optional
 
 
 class LikeResponse(BaseModel):
     id: UUID
     user_id: UUID
-    post_id: UUID
+    target_type: str
+    target_id: UUID
+    value: int
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+
+class LikePage(BaseModel):
+    likes: List[LikeResponse]
+    count: int
+    next_cursor: Optional[str] = None
@@ -1,7 +1,10 @@
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
+
+from app.schemas.common import UserSummary
+from app.schemas.tag import TagFacet
 
 
 class PostCreate(BaseModel):
@@ -27,10 +30,29 @@ class PostResponse(BaseModel):
     slug: str
     content: Optional[str]
     excerpt: Optional[str]
+    type: str = "post"
+    map_id: Optional[UUID] = None
     published: bool
     views: int
+    likes: int = 0
+    dislikes: int = 0
+    comment_count: int = 0
     created_at: datetime
     updated_at: datetime
+    tags: List[str] = Field(default_factory=list, validation_alias=AliasChoices("tag_slugs", "tags"))
+    owner: Optional[UserSummary] = None
 
     class Config:
         from_attributes = True
+
+
+class PostPage(BaseModel):
+    posts: List[PostResponse]
+    count: int
+    next_cursor: Optional[str] = None
+    facets: Optional[List[TagFacet]] = None
+
+
+class PostBatch(BaseModel):
+    posts: List[PostResponse]
+    missing: List[UUID]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 
 
 class TagCreate(BaseModel):
@@ -17,6 +17,18 @@ class TagResponse(BaseModel):
     id: UUID
     name: str
     slug: str
+    post_count: int = 0
 
     class Config:
         from_attributes = True
+
+
+class TagPage(BaseModel):
+    tags: List[TagResponse]
+    count: int
+    next_cursor: Optional[str] = None
+
+
+class TagFacet(BaseModel):
+    slug: str
+    count: int
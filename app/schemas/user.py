@@ -1,7 +1,7 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 
 
 class UserCreate(BaseModel):
@@ -30,3 +30,8 @@ class UserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class UserBatch(BaseModel):
+    users: List[UserResponse]
+    missing: List[UUID]
@@ -1,7 +1,9 @@
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
+
+from app.schemas.common import MapSummary, UserSummary
 
 
 class VideoCreate(BaseModel):
@@ -14,6 +16,16 @@ class VideoCreate(BaseModel):
     side: Optional[str] = None
 
 
+class VideoUploadCreate(BaseModel):
+    title: str
+    size: int
+    filename: Optional[str] = None
+    content_type: str = "video/mp4"
+    description: Optional[str] = None
+    agent: Optional[str] = None
+    side: Optional[str] = None
+
+
 class VideoUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -25,12 +37,31 @@ class VideoResponse(BaseModel):
     id: UUID
     owner_id: Optional[UUID]
     title: str
-    video_url: str
+    video_url: Optional[str]
+    thumbnail_url: Optional[str] = Field(None, validation_alias=AliasChoices("thumb_url", "thumbnail_url"))
     description: Optional[str]
+    map_id: Optional[UUID] = None
+    agent: Optional[str] = None
+    side: Optional[str] = None
     likes: int
     dislikes: int
     views: int
+    published: bool = True
     created_at: datetime
+    updated_at: Optional[datetime] = None
+    owner: Optional[UserSummary] = None
+    map: Optional[MapSummary] = None
 
     class Config:
         from_attributes = True
+
+
+class VideoPage(BaseModel):
+    videos: List[VideoResponse]
+    count: int
+    next_cursor: Optional[str] = None
+
+
+class VideoBatch(BaseModel):
+    videos: List[VideoResponse]
+    missing: List[UUID]
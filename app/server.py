@@ -0,0 +1,210 @@
+"""Боевой запуск: несколько воркеров uvicorn на общем сокете.
+
+Приложение импортируется один раз в мастере, затем процесс форкается:
+код, схемы и мапперы остаются общими страницами памяти воркеров.
+
+    python -m app.server
+"""
+import gc
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+# До импорта приложения: без сборок мусора в мастере не появляются
+# "дыры" в страницах, которые потом пришлось бы копировать в каждом воркере
+gc.disable()
+
+import uvicorn
+
+from app.core.log import get_logger, log_output
+from app.core.settings.settings import settings
+
+# Воркер, упавший быстрее этого, не поднимется и при перезапуске
+BOOT_TIMEOUT = 10.0
+# Код выхода воркера, у которого не прошёл startup приложения
+STARTUP_FAILURE = 3
+
+log = get_logger("server")
+
+
+def worker_count() -> int:
+    return settings.WEB_WORKERS or os.cpu_count() or 1
+
+
+def metrics_dir() -> bool:
+    """Общий каталог метрик воркеров; True - создан здесь и удаляется при выходе"""
+    if settings.METRICS_DIR:
+        # Файлы прошлого запуска сложились бы с новыми счётчиками
+        for path in Path(settings.METRICS_DIR).glob("*.json"):
+            path.unlink()
+        return False
+    settings.METRICS_DIR = tempfile.mkdtemp(prefix="linap-metrics-")
+    return True
+
+
+def bind_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((settings.WEB_HOST, settings.API_BASE_PORT))
+    sock.listen(settings.WEB_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn.Server, который по сигналу остановки сначала WEB_DRAIN_SECONDS "дренируется":
+    /health/ready отвечает 503, но запросы ещё обслуживаются
+    """
+
+    def __init__(self, config: uvicorn.Config, app):
+        super().__init__(config)
+        self.app = app
+        self.drain_until: Optional[float] = None
+
+    def handle_exit(self, sig, frame) -> None:
+        if self.drain_until is None and settings.WEB_DRAIN_SECONDS > 0:
+            self.app.state.ready = False
+            self.app.state.draining = True
+            self.drain_until = time.monotonic() + settings.WEB_DRAIN_SECONDS
+            return
+        # Повторный сигнал - останавливаться, не дожидаясь конца дренажа
+        super().handle_exit(sig, frame)
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.drain_until is not None and time.monotonic() >= self.drain_until:
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+
+def serve(app, sock: socket.socket) -> int:
+    """Тело воркера: свой event loop uvloop и парсер httptools на общем сокете"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGALRM, signal.SIG_DFL)
+    gc.enable()
+
+    # Пул создан в мастере до форка: соединений в нём ещё нет, но состояние
+    # пула у каждого процесса должно быть своим
+    from app.core.database.database import engine, replica_engine
+    engine.sync_engine.dispose(close=False)
+    if replica_engine is not engine:
+        replica_engine.sync_engine.dispose(close=False)
+
+    config = uvicorn.Config(
+        app,
+        loop="uvloop",
+        http="httptools",
+        lifespan="on",
+        # Логирование настраивает приложение (app.core.log), а не uvicorn
+        log_config=None,
+        backlog=settings.WEB_BACKLOG,
+        timeout_graceful_shutdown=settings.WEB_GRACEFUL_TIMEOUT,
+    )
+    server = WorkerServer(config, app)
+    # По SIGTERM воркер дренируется, затем uvicorn перестаёт принимать соединения,
+    # дожидается текущих запросов и выполняет shutdown приложения (сброс буферов
+    # просмотров и рейтинга)
+    server.run(sockets=[sock])
+    return 0 if server.started else STARTUP_FAILURE
+
+
+class Arbiter:
+    """Мастер: держит нужное число воркеров и останавливает их по сигналу"""
+
+    def __init__(self, app, sock: socket.socket, workers: int):
+        self.app = app
+        self.sock = sock
+        self.size = workers
+        self.workers: dict[int, float] = {}
+        self.stopping = False
+        self.exit_code = 0
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = serve(self.app, self.sock)
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+
+    def stop(self, signum=None, frame=None) -> None:
+        if not self.stopping:
+            log.info("stopping", workers=len(self.workers))
+        self.stopping = True
+        self.signal_workers(signal.SIGTERM)
+        # Воркеры, не уложившиеся в отведённое время, добиваются
+        signal.alarm(settings.WEB_DRAIN_SECONDS + settings.WEB_GRACEFUL_TIMEOUT + 5)
+
+    def kill(self, signum=None, frame=None) -> None:
+        log.warning("graceful_shutdown_timed_out", workers=len(self.workers))
+        self.signal_workers(signal.SIGKILL)
+
+    def signal_workers(self, signum: int) -> None:
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+
+    def reap(self, pid: int, status: int) -> None:
+        started = self.workers.pop(pid, None)
+        if started is None or self.stopping:
+            return
+        code = os.waitstatus_to_exitcode(status)
+        if code == STARTUP_FAILURE or time.monotonic() - started < BOOT_TIMEOUT:
+            log.error("worker_boot_failed", pid=pid, exit_code=code)
+            self.exit_code = STARTUP_FAILURE
+            self.stop()
+            return
+        log.warning("worker_restarted", pid=pid, exit_code=code)
+        self.spawn()
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGALRM, self.kill)
+        # Всё, что создано импортом, переносится в постоянное поколение:
+        # сборщик в воркерах не трогает эти объекты и не копирует их страницы
+        gc.freeze()
+        for _ in range(self.size):
+            self.spawn()
+        log.info("listening", host=settings.WEB_HOST, port=settings.API_BASE_PORT, workers=self.size)
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            self.reap(pid, status)
+        signal.alarm(0)
+        return self.exit_code
+
+
+def main() -> int:
+    # Предзагрузка: импорт приложения и сборка мапперов до форка
+    from sqlalchemy.orm import configure_mappers
+    # Мастер пишет логи сам: фоновый поток не пережил бы fork
+    log_output.configure(background=False)
+    # Фактическое число воркеров - до импорта приложения: по нему модули решают,
+    # можно ли держать общее состояние (рейтинг "горячих") в памяти процесса
+    settings.WEB_WORKERS = worker_count()
+    from app.main import app
+    configure_mappers()
+    sock = bind_socket()
+    created = metrics_dir()
+    try:
+        return Arbiter(app, sock, worker_count()).run()
+    finally:
+        if created:
+            shutil.rmtree(settings.METRICS_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
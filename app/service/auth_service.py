@@ -6,9 +6,13 @@ from fastapi import HTTPException, status
 
 from app.models.user import User
 from app.models.auth_account import AuthAccount
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import get_password_hash_async, verify_password_async, create_access_token
+from app.core.log import get_logger
 from datetime import timedelta
 
+# При наплыве логинов эти события идут сотнями в секунду
+log = get_logger("auth").limit("login_failed").limit("login_succeeded").limit("registration_rejected")
+
 
 class AuthService:
     """Сервис для аутентификации"""
@@ -24,14 +28,12 @@ class AuthService:
         display_name: Optional[str] = None
     ) -> User:
         """Регистрация нового пользователя"""
-        print(f"[REGISTER] Attempting to register user: {username}, email: {email}")
-        
         # Проверяем уникальность username
         existing_user = await self.session.execute(
             select(User).where(User.username == username)
         )
         if existing_user.scalars().first():
-            print(f"[REGISTER] Username already exists: {username}")
+            log.info("registration_rejected", username=username, reason="username_taken")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already exists"
@@ -42,7 +44,7 @@ class AuthService:
             select(User).where(User.email == email)
         )
         if existing_email.scalars().first():
-            print(f"[REGISTER] Email already registered: {email}")
+            log.info("registration_rejected", username=username, reason="email_taken")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -58,13 +60,10 @@ class AuthService:
 
         self.session.add(user)
         await self.session.flush()
-        
-        print(f"[REGISTER] User created with ID: {user.id}")
 
         # Создаем учетную запись с паролем
-        password_hash = get_password_hash(password)
-        print(f"[REGISTER] Password hashed, creating auth account...")
-        
+        password_hash = await get_password_hash_async(password)
+
         auth_account = AuthAccount(
             user_id=user.id,
             provider="local",
@@ -76,13 +75,11 @@ class AuthService:
         await self.session.commit()
         await self.session.refresh(user)
 
-        print(f"[REGISTER] Registration successful for user: {username}")
+        log.info("user_registered", user_id=user.id, username=username)
         return user
 
     async def authenticate(self, username_or_email: str, password: str) -> User:
         """Аутентифицировать пользователя по username или email"""
-        print(f"[AUTH] Attempting to authenticate user: {username_or_email}")
-        
         # Находим пользователя по username или email
         result = await self.session.execute(
             select(User).where(
@@ -92,15 +89,14 @@ class AuthService:
         user = result.scalars().first()
 
         if not user:
-            print(f"[AUTH] User not found: {username_or_email}")
+            log.warning("login_failed", login=username_or_email, reason="user_not_found")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
 
-        print(f"[AUTH] User found: {user.username}, is_active: {user.is_active}")
-
         if not user.is_active:
+            log.warning("login_failed", login=username_or_email, reason="inactive")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User account is deactivated"
@@ -116,25 +112,23 @@ class AuthService:
         auth_account = auth_result.scalars().first()
 
         if not auth_account or not auth_account.password_hash:
-            print(f"[AUTH] No auth account found for user: {username_or_email}")
+            log.warning("login_failed", login=username_or_email, reason="no_password")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
 
-        print(f"[AUTH] Auth account found, verifying password...")
-        
         # Проверяем пароль
-        password_valid = verify_password(password, auth_account.password_hash)
-        print(f"[AUTH] Password verification result: {password_valid}")
-        
+        password_valid = await verify_password_async(password, auth_account.password_hash)
+
         if not password_valid:
+            log.warning("login_failed", login=username_or_email, reason="invalid_password")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
 
-        print(f"[AUTH] Authentication successful for user: {username_or_email}")
+        log.info("login_succeeded", user_id=user.id)
         return user
 
     async def change_password(
@@ -168,14 +162,14 @@ class AuthService:
             )
 
         # Проверяем старый пароль
-        if not verify_password(old_password, auth_account.password_hash):
+        if not await verify_password_async(old_password, auth_account.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Old password is incorrect"
             )
 
         # Устанавливаем новый пароль
-        auth_account.password_hash = get_password_hash(new_password)
+        auth_account.password_hash = await get_password_hash_async(new_password)
         await self.session.commit()
 
         return True
@@ -1,11 +1,15 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import uuid
-from sqlalchemy import select, desc
+from datetime import datetime, timezone
+from sqlalchemy import select, update, and_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
 from app.models.comment import Comment
+from app.models.post import Post
+from app.core.pagination import keyset_paginate, keyset_page, decode_cursor
+from app.core.fields import FieldSelection, sparse_options
+from app.core.cache import response_cache
 
 
 class CommentService:
@@ -17,53 +21,145 @@ class CommentService:
     async def get_comment_by_id(self, comment_id: uuid.UUID) -> Optional[Comment]:
         """Получить комментарий по ID"""
         result = await self.session.execute(
-            select(Comment)
-            .where(Comment.id == comment_id)
-            .options(selectinload(Comment.author))
+            select(Comment).where(Comment.id == comment_id)
         )
         return result.scalars().first()
 
-    async def get_post_comments(self, post_id: uuid.UUID, skip: int = 0, limit: int = 50) -> List[Comment]:
+    async def get_post_comments(
+        self,
+        post_id: uuid.UUID,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        fields: Optional[FieldSelection] = None
+    ) -> Tuple[List[Comment], Optional[str]]:
         """Получить комментарии поста"""
-        result = await self.session.execute(
-            select(Comment)
-            .where(Comment.post_id == post_id)
-            .options(selectinload(Comment.author))
-            .order_by(desc(Comment.created_at))
-            .offset(skip)
-            .limit(limit)
+        options = sparse_options(Comment, fields, Comment.created_at) if fields else []
+        query = keyset_paginate(
+            select(Comment).where(Comment.post_id == post_id).options(*options),
+            Comment.created_at, Comment.id, cursor, limit
         )
-        return result.scalars().all()
+        result = await self.session.execute(query)
+        return keyset_page(result.scalars().all(), Comment.created_at, limit)
 
-    async def get_user_comments(self, user_id: uuid.UUID, skip: int = 0, limit: int = 50) -> List[Comment]:
+    async def get_user_comments(
+        self,
+        user_id: uuid.UUID,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        fields: Optional[FieldSelection] = None
+    ) -> Tuple[List[Comment], Optional[str]]:
         """Получить комментарии пользователя"""
+        options = sparse_options(Comment, fields, Comment.created_at) if fields else []
+        query = keyset_paginate(
+            select(Comment).where(Comment.user_id == user_id).options(*options),
+            Comment.created_at, Comment.id, cursor, limit
+        )
+        result = await self.session.execute(query)
+        return keyset_page(result.scalars().all(), Comment.created_at, limit)
+
+    async def get_comment_tree(
+        self,
+        post_id: uuid.UUID,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        max_depth: int = 3
+    ) -> Tuple[List[Comment], Optional[str]]:
+        """Получить ветки комментариев поста: страница корней (новые сверху) с ответами до max_depth.
+
+        Всё дерево страницы приходит одним запросом: корни отбираются в CTE, их поддеревья -
+        диапазонами по path из индекса (post_id, path). Строки возвращаются в порядке обхода дерева.
+        """
+        roots = select(Comment.path).where(
+            Comment.post_id == post_id,
+            Comment.parent_id.is_(None)
+        )
+        if cursor:
+            value, row_id = decode_cursor(Comment.created_at.key, cursor, datetime)
+            roots = roots.where(tuple_(Comment.created_at, Comment.id) < (value, row_id))
+        roots = roots.order_by(Comment.created_at.desc(), Comment.id.desc()).limit(limit + 1).cte("roots")
+
         result = await self.session.execute(
             select(Comment)
-            .where(Comment.author_id == user_id)
-            .options(selectinload(Comment.author))
-            .order_by(desc(Comment.created_at))
-            .offset(skip)
-            .limit(limit)
+            .join(roots, and_(
+                Comment.path >= roots.c.path,
+                # "/" идёт сразу после "." - верхняя граница поддерева корня
+                Comment.path < roots.c.path + "/"
+            ))
+            .where(Comment.post_id == post_id, Comment.depth <= max_depth)
+            .order_by(Comment.path)
+        )
+        rows = result.scalars().all()
+
+        page_roots = sorted(
+            (c for c in rows if c.parent_id is None),
+            key=lambda c: (c.created_at, c.id),
+            reverse=True
         )
-        return result.scalars().all()
+        _, next_cursor = keyset_page(page_roots, Comment.created_at, limit)
+        if next_cursor:
+            # Поддерево лишнего (limit + 1)-го корня отбрасываем
+            extra = page_roots[-1].path
+            rows = [c for c in rows if c.path != extra and not c.path.startswith(extra + ".")]
+        return rows, next_cursor
 
     async def create_comment(
         self,
         post_id: uuid.UUID,
-        author_id: uuid.UUID,
+        user_id: uuid.UUID,
         content: str,
         parent_id: Optional[uuid.UUID] = None
     ) -> Comment:
         """Создать новый комментарий"""
+        comment_id = uuid.uuid4()
+        created_at = datetime.now(timezone.utc)
+        # Ключ узла: время в микросекундах (порядок среди соседей) + начало id (уникальность)
+        segment = f"{int(created_at.timestamp() * 1_000_000):014x}{comment_id.hex[:8]}"
+
+        # Счётчик поста сдвигается в той же транзакции, что и вставка
+        result = await self.session.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(comment_count=Post.comment_count + 1)
+            .returning(Post.id)
+        )
+        if result.first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Post not found"
+            )
+
+        path, depth = segment, 0
+        if parent_id is not None:
+            result = await self.session.execute(
+                update(Comment)
+                .where(Comment.id == parent_id, Comment.post_id == post_id)
+                .values(reply_count=Comment.reply_count + 1)
+                .returning(Comment.path, Comment.depth)
+            )
+            parent = result.first()
+            if parent is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Parent comment not found"
+                )
+            path, depth = f"{parent.path}.{segment}", parent.depth + 1
+
         comment = Comment(
+            id=comment_id,
             post_id=post_id,
-            author_id=author_id,
+            user_id=user_id,
             content=content,
-            parent_id=parent_id
+            parent_id=parent_id,
+            path=path,
+            depth=depth,
+            created_at=created_at,
+            updated_at=created_at
         )
 
         self.session.add(comment)
         await self.session.commit()
+        # comment_count поста отдаётся в закэшированных лентах постов
+        await response_cache.invalidate("posts")
         await self.session.refresh(comment)
         return comment
 
@@ -83,13 +179,34 @@ class CommentService:
 
     async def delete_comment(self, comment_id: uuid.UUID) -> bool:
         """Удалить комментарий"""
-        comment = await self.get_comment_by_id(comment_id)
-        if not comment:
+        # Блокировка строки: два параллельных удаления не уменьшат счётчики дважды
+        result = await self.session.execute(
+            select(Comment).where(Comment.id == comment_id).with_for_update()
+        )
+        comment = result.scalars().first()
+        if not comment or comment.is_deleted:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Comment not found"
             )
 
-        await self.session.delete(comment)
+        await self.session.execute(
+            update(Post)
+            .where(Post.id == comment.post_id)
+            .values(comment_count=Post.comment_count - 1)
+        )
+        if comment.reply_count > 0:
+            # Ветку с ответами не рвём: оставляем узел-заглушку
+            comment.is_deleted = True
+            comment.content = ""
+        else:
+            if comment.parent_id is not None:
+                await self.session.execute(
+                    update(Comment)
+                    .where(Comment.id == comment.parent_id)
+                    .values(reply_count=Comment.reply_count - 1)
+                )
+            await self.session.delete(comment)
         await self.session.commit()
+        await response_cache.invalidate("posts")
         return True
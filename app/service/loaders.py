@@ -0,0 +1,27 @@
+import asyncio
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.database.database import get_read_db
+from app.core.loader import BatchLoader
+from app.models.post import Post
+from app.models.user import User
+from app.models.video import Video
+from app.service.video_service import SUMMARY_LOADERS
+
+
+class RequestLoaders:
+    """Набор загрузчиков одного HTTP-запроса"""
+
+    def __init__(self, session: AsyncSession):
+        lock = asyncio.Lock()
+        self.users = BatchLoader(session, lock, User)
+        self.videos = BatchLoader(session, lock, Video, list(SUMMARY_LOADERS.values()))
+        self.posts = BatchLoader(session, lock, Post, [selectinload(Post.owner)])
+
+
+async def get_loaders(session: AsyncSession = Depends(get_read_db)) -> RequestLoaders:
+    """Загрузчики живут ровно один запрос, поэтому их кэш не устаревает"""
+    return RequestLoaders(session)
@@ -1,12 +1,18 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import uuid
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func, delete, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
 from app.models.post import Post
 from app.models.user import User
+from app.models.tag import Tag
+from app.models.post_tag import PostTag
+from app.core.pagination import keyset_paginate, keyset_page
+from app.core.fields import FieldSelection, sparse_options
+from app.core.cache import response_cache
+from app.core.view_counter import view_counter
 
 
 class PostService:
@@ -33,29 +39,77 @@ class PostService:
         )
         return result.scalars().first()
 
-    async def get_user_posts(self, user_id: uuid.UUID, skip: int = 0, limit: int = 20) -> List[Post]:
+    async def get_user_posts(
+        self,
+        user_id: uuid.UUID,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        fields: Optional[FieldSelection] = None
+    ) -> Tuple[List[Post], Optional[str]]:
         """Получить посты пользователя"""
-        result = await self.session.execute(
+        options = sparse_options(Post, fields, Post.created_at) if fields else [selectinload(Post.owner)]
+        query = keyset_paginate(
             select(Post)
             .where(Post.owner_id == user_id)
-            .options(selectinload(Post.owner))
-            .order_by(desc(Post.created_at))
-            .offset(skip)
-            .limit(limit)
+            .options(*options),
+            Post.created_at, Post.id, cursor, limit
         )
-        return result.scalars().all()
+        result = await self.session.execute(query)
+        return keyset_page(result.scalars().all(), Post.created_at, limit)
+
+    async def get_published_posts(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        fields: Optional[FieldSelection] = None,
+        tags: Optional[List[str]] = None,
+        match_all: bool = True
+    ) -> Tuple[List[Post], Optional[str]]:
+        """Получить опубликованные посты, при необходимости - с фильтром по тегам"""
+        options = sparse_options(Post, fields, Post.created_at) if fields else [selectinload(Post.owner)]
+        query = select(Post).where(Post.published == True).options(*options)
+        if tags:
+            query = query.where(self._tags_filter(tags, match_all))
+        query = keyset_paginate(query, Post.created_at, Post.id, cursor, limit)
+        result = await self.session.execute(query)
+        return keyset_page(result.scalars().all(), Post.created_at, limit)
+
+    @staticmethod
+    def _tags_filter(tags: List[str], match_all: bool):
+        # @> (все теги) и && (любой из тегов) обслуживаются GIN-индексом по tag_slugs
+        return Post.tag_slugs.contains(tags) if match_all else Post.tag_slugs.overlap(tags)
+
+    async def get_tag_facets(
+        self,
+        tags: Optional[List[str]] = None,
+        match_all: bool = True,
+        limit: int = 20
+    ) -> List[dict]:
+        """Сколько отфильтрованных постов несёт каждый из остальных тегов"""
+        if not tags:
+            # Без фильтра хватает готовых счётчиков тегов (они тоже только по опубликованным)
+            result = await self.session.execute(
+                select(Tag.slug, Tag.post_count.label("count"))
+                .where(Tag.post_count > 0)
+                .order_by(Tag.post_count.desc(), Tag.slug)
+                .limit(limit)
+            )
+            return [dict(row._mapping) for row in result.all()]
 
-    async def get_published_posts(self, skip: int = 0, limit: int = 20) -> List[Post]:
-        """Получить опубликованные посты"""
+        slugs = (
+            select(func.unnest(Post.tag_slugs).label("slug"))
+            .where(Post.published == True, self._tags_filter(tags, match_all))
+            .subquery()
+        )
+        count = func.count().label("count")
         result = await self.session.execute(
-            select(Post)
-            .where(Post.published == True)
-            .options(selectinload(Post.owner))
-            .order_by(desc(Post.created_at))
-            .offset(skip)
+            select(slugs.c.slug, count)
+            .where(slugs.c.slug.notin_(tags))
+            .group_by(slugs.c.slug)
+            .order_by(count.desc(), slugs.c.slug)
             .limit(limit)
         )
-        return result.scalars().all()
+        return [dict(row._mapping) for row in result.all()]
 
     async def create_post(
         self,
@@ -88,6 +142,7 @@ class PostService:
 
         self.session.add(post)
         await self.session.commit()
+        await response_cache.invalidate("posts")
         await self.session.refresh(post)
         return post
 
@@ -116,60 +171,117 @@ class PostService:
                 setattr(post, field, value)
 
         await self.session.commit()
+        await response_cache.invalidate("posts")
         await self.session.refresh(post)
         return post
 
     async def publish_post(self, post_id: uuid.UUID) -> Post:
         """Опубликовать пост"""
-        post = await self.get_post_by_id(post_id)
-        if not post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Post not found"
-            )
-
-        post.published = True
-        await self.session.commit()
-        await self.session.refresh(post)
-        return post
+        return await self._set_published(post_id, True)
 
     async def unpublish_post(self, post_id: uuid.UUID) -> Post:
         """Отменить публикацию поста"""
-        post = await self.get_post_by_id(post_id)
+        return await self._set_published(post_id, False)
+
+    async def _lock_post(self, post_id: uuid.UUID) -> Post:
+        # Блокировка строки: параллельные изменения тегов и публикации
+        # не должны сдвинуть счётчики тегов дважды
+        result = await self.session.execute(
+            select(Post).where(Post.id == post_id).with_for_update()
+        )
+        post = result.scalars().first()
         if not post:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Post not found"
             )
-
-        post.published = False
-        await self.session.commit()
-        await self.session.refresh(post)
         return post
 
-    async def increment_views(self, post_id: uuid.UUID) -> Post:
-        """Увеличить количество просмотров"""
-        post = await self.get_post_by_id(post_id)
-        if not post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Post not found"
+    async def _set_published(self, post_id: uuid.UUID, published: bool) -> Post:
+        """Сменить статус публикации; post_count тегов считает только опубликованные посты"""
+        post = await self._lock_post(post_id)
+        if post.published != published and post.tag_slugs:
+            await self.session.execute(
+                update(Tag)
+                .where(Tag.slug.in_(post.tag_slugs))
+                .values(post_count=Tag.post_count + (1 if published else -1))
             )
-
-        post.views += 1
+        post.published = published
         await self.session.commit()
+        await response_cache.invalidate("posts")
+        await response_cache.invalidate("tags")
         await self.session.refresh(post)
         return post
 
+    async def increment_views(self, post_id: uuid.UUID) -> None:
+        """Увеличить количество просмотров (запись в базу - пачкой в фоне)"""
+        view_counter.increment(Post, post_id)
+
     async def delete_post(self, post_id: uuid.UUID) -> bool:
         """Удалить пост"""
-        post = await self.get_post_by_id(post_id)
-        if not post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Post not found"
-            )
-
+        post = await self._lock_post(post_id)
+        await self._change_tag_links(post.id, removed=list(post.tag_slugs), counted=post.published)
         await self.session.delete(post)
         await self.session.commit()
+        await response_cache.invalidate("posts")
+        await response_cache.invalidate("tags")
         return True
+
+    async def set_post_tags(self, post_id: uuid.UUID, slugs: List[str]) -> Post:
+        """Заменить теги поста, поправив счётчики только у изменившихся тегов"""
+        post = await self._lock_post(post_id)
+
+        slugs = list(dict.fromkeys(slugs))
+        tag_ids = {}
+        if slugs:
+            result = await self.session.execute(
+                select(Tag.slug, Tag.id).where(Tag.slug.in_(slugs))
+            )
+            tag_ids = dict(result.all())
+            unknown = [slug for slug in slugs if slug not in tag_ids]
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown tags: {', '.join(unknown)}"
+                )
+
+        await self._change_tag_links(
+            post.id,
+            added=[(slug, tag_ids[slug]) for slug in slugs if slug not in post.tag_slugs],
+            removed=[slug for slug in post.tag_slugs if slug not in slugs],
+            counted=post.published,
+        )
+        post.tag_slugs = slugs
+
+        await self.session.commit()
+        await response_cache.invalidate("posts")
+        await response_cache.invalidate("tags")
+        return await self.get_post_by_id(post_id)
+
+    async def _change_tag_links(
+        self,
+        post_id: uuid.UUID,
+        added: List[Tuple[str, uuid.UUID]] = (),
+        removed: List[str] = (),
+        counted: bool = True
+    ) -> None:
+        """Добавить/убрать связи post_tags; post_count сдвигается, если пост опубликован (counted)"""
+        if removed:
+            await self.session.execute(
+                delete(PostTag).where(
+                    PostTag.post_id == post_id,
+                    PostTag.tag_id.in_(select(Tag.id).where(Tag.slug.in_(removed)))
+                )
+            )
+            if counted:
+                await self.session.execute(
+                    update(Tag).where(Tag.slug.in_(removed)).values(post_count=Tag.post_count - 1)
+                )
+        if added:
+            await self.session.execute(
+                insert(PostTag).values([{"post_id": post_id, "tag_id": tag_id} for _, tag_id in added])
+            )
+            if counted:
+                await self.session.execute(
+                    update(Tag).where(Tag.slug.in_([slug for slug, _ in added])).values(post_count=Tag.post_count + 1)
+                )
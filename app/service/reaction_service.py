@@ -0,0 +1,171 @@
+from typing import Optional, List, Tuple
+import uuid
+from sqlalchemy import select, update, case, cast, func, Integer
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+
+from app.models.like import Like
+from app.models.post import Post
+from app.models.video import Video
+from app.models.comment import Comment
+from app.core.pagination import keyset_paginate, keyset_page
+from app.core.trending import trending
+from app.core.settings.settings import settings
+
+
+class ReactionService:
+    """Сервис реакций (лайк/дизлайк) на посты, видео и комментарии"""
+
+    TARGETS = {"post": Post, "video": Video, "comment": Comment}
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _target_model(self, target_type: str):
+        model = self.TARGETS.get(target_type)
+        if model is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown target type: {target_type}"
+            )
+        return model
+
+    def _apply_to_aggregates(self, model, target_id: uuid.UUID, changed):
+        """UPDATE агрегатов цели по изменённой строке журнала (prev_value -> value)"""
+        def delta(v: int):
+            return cast(changed.c.value == v, Integer) - cast(changed.c.prev_value == v, Integer)
+
+        # Для видео заодно возвращаем срезы ленты - они нужны рейтингу "горячих"
+        extra = (model.agent, model.map_id) if model is Video else ()
+        return (
+            update(model)
+            .where(model.id == target_id)
+            .values(likes=model.likes + delta(1), dislikes=model.dislikes + delta(-1))
+            .returning(model.likes, model.dislikes, changed.c.value, changed.c.prev_value, *extra)
+        )
+
+    async def _execute(self, stmt, not_found_detail: str):
+        result = await self.session.execute(stmt)
+        row = result.first()
+        if row is None:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=not_found_detail
+            )
+        await self.session.commit()
+        return row
+
+    @staticmethod
+    def _reaction(row) -> dict:
+        return {"value": row.value, "likes": row.likes, "dislikes": row.dislikes}
+
+    async def react(
+        self,
+        user_id: uuid.UUID,
+        target_type: str,
+        target_id: uuid.UUID,
+        value: int,
+        toggle: bool = True
+    ) -> dict:
+        """Поставить реакцию (1 или -1); повторная такая же реакция снимает её при toggle"""
+        if value not in (1, -1):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Reaction value must be 1 or -1"
+            )
+        model = self._target_model(target_type)
+
+        stmt = insert(Like).values(
+            user_id=user_id,
+            target_type=target_type,
+            target_id=target_id,
+            value=value,
+            prev_value=0
+        )
+        new_value = stmt.excluded.value
+        if toggle:
+            new_value = case((Like.value == stmt.excluded.value, 0), else_=stmt.excluded.value)
+        changed = (
+            stmt.on_conflict_do_update(
+                constraint="uq_likes_user_target",
+                set_={"prev_value": Like.value, "value": new_value, "created_at": func.now()}
+            )
+            .returning(Like.value, Like.prev_value)
+            .cte("changed")
+        )
+
+        # Журнал и агрегат меняются одним запросом: строка цели блокируется UPDATE,
+        # поэтому конкурентные реакции складываются корректно
+        row = await self._execute(
+            self._apply_to_aggregates(model, target_id, changed),
+            f"{target_type.capitalize()} not found"
+        )
+        if model is Video and row.value == 1 and row.prev_value != 1:
+            trending.record(target_id, settings.TRENDING_LIKE_WEIGHT, trending.scopes(row.agent, row.map_id))
+        return self._reaction(row)
+
+    async def remove_reaction(self, user_id: uuid.UUID, target_type: str, target_id: uuid.UUID) -> dict:
+        """Снять реакцию пользователя"""
+        model = self._target_model(target_type)
+
+        changed = (
+            update(Like)
+            .where(
+                Like.user_id == user_id,
+                Like.target_type == target_type,
+                Like.target_id == target_id,
+                Like.value != 0
+            )
+            .values(prev_value=Like.value, value=0)
+            .returning(Like.value, Like.prev_value)
+            .cte("changed")
+        )
+
+        row = await self._execute(
+            self._apply_to_aggregates(model, target_id, changed),
+            "Like not found"
+        )
+        return self._reaction(row)
+
+    async def get_user_reaction(self, user_id: uuid.UUID, target_type: str, target_id: uuid.UUID) -> int:
+        """Текущая реакция пользователя на объект (0 - нет)"""
+        result = await self.session.execute(
+            select(Like.value).where(
+                Like.user_id == user_id,
+                Like.target_type == target_type,
+                Like.target_id == target_id
+            )
+        )
+        return result.scalar() or 0
+
+    async def get_user_likes(
+        self,
+        user_id: uuid.UUID,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Like], Optional[str]]:
+        """Получить реакции пользователя"""
+        query = keyset_paginate(
+            select(Like).where(Like.user_id == user_id, Like.value != 0),
+            Like.created_at, Like.id, cursor, limit
+        )
+        result = await self.session.execute(query)
+        return keyset_page(result.scalars().all(), Like.created_at, limit)
+
+    async def get_target_likes(
+        self,
+        target_type: str,
+        target_id: uuid.UUID,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Like], Optional[str]]:
+        """Получить реакции на объект"""
+        self._target_model(target_type)
+        query = keyset_paginate(
+            select(Like).where(Like.target_type == target_type, Like.target_id == target_id, Like.value != 0),
+            Like.created_at, Like.id, cursor, limit
+        )
+        result = await self.session.execute(query)
+        return keyset_page(result.scalars().all(), Like.created_at, limit)
@@ -0,0 +1,62 @@
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, with_expression
+
+from app.models.post import Post
+from app.models.video import Video
+from app.core.pagination import keyset_paginate, keyset_page
+from app.service.video_service import SUMMARY_LOADERS
+
+# Конфигурация должна совпадать с той, что в выражениях search_vector моделей
+SEARCH_CONFIG = "simple"
+
+
+class SearchService:
+    """Полнотекстовый поиск по видео и постам"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def _tsquery(q: str):
+        q = q.strip()
+        if not q:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search query is empty"
+            )
+        # websearch_to_tsquery понимает "фразы", OR и -исключения и не падает на произвольном вводе
+        return func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+    async def _search(self, model, options, q: str, cursor: Optional[str], limit: int):
+        tsquery = self._tsquery(q)
+        rank = func.ts_rank_cd(model.search_vector, tsquery, type_=Float).label("search_rank")
+        query = keyset_paginate(
+            select(model)
+            .where(model.published == True, model.search_vector.op("@@")(tsquery))
+            .options(with_expression(model.search_rank, rank), *options),
+            rank, model.id, cursor, limit
+        )
+        result = await self.session.execute(query)
+        return keyset_page(result.scalars().all(), rank, limit)
+
+    async def search_videos(
+        self,
+        q: str,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[Video], Optional[str]]:
+        """Найти опубликованные видео, самые релевантные сверху"""
+        return await self._search(Video, SUMMARY_LOADERS.values(), q, cursor, limit)
+
+    async def search_posts(
+        self,
+        q: str,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[Post], Optional[str]]:
+        """Найти опубликованные посты, самые релевантные сверху"""
+        return await self._search(Post, [selectinload(Post.owner)], q, cursor, limit)
@@ -1,10 +1,14 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import uuid
-from sqlalchemy import select
+from sqlalchemy import select, delete, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models.tag import Tag
+from app.models.post import Post
+from app.models.post_tag import PostTag
+from app.core.pagination import keyset_paginate, keyset_page
+from app.core.cache import response_cache
 
 
 class TagService:
@@ -27,12 +31,11 @@ class TagService:
         )
         return result.scalars().first()
 
-    async def get_all_tags(self, skip: int = 0, limit: int = 100) -> List[Tag]:
-        """Получить все теги"""
-        result = await self.session.execute(
-            select(Tag).offset(skip).limit(limit)
-        )
-        return result.scalars().all()
+    async def get_all_tags(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Tag], Optional[str]]:
+        """Получить все теги (по алфавиту)"""
+        query = keyset_paginate(select(Tag), Tag.name, Tag.id, cursor, limit, descending=False)
+        result = await self.session.execute(query)
+        return keyset_page(result.scalars().all(), Tag.name, limit)
 
     async def create_tag(self, name: str, slug: Optional[str] = None) -> Tag:
         """Создать новый тег"""
@@ -48,6 +51,7 @@ class TagService:
 
         self.session.add(tag)
         await self.session.commit()
+        await response_cache.invalidate("tags")
         await self.session.refresh(tag)
         return tag
 
@@ -71,11 +75,21 @@ class TagService:
 
         update_fields = {k: v for k, v in update_data.items() if v is not None}
 
+        # Денормализованные slug в постах переименовываются вместе с тегом
+        if "slug" in update_fields and update_fields["slug"] != tag.slug:
+            await self.session.execute(
+                update(Post)
+                .where(Post.tag_slugs.contains([tag.slug]))
+                .values(tag_slugs=func.array_replace(Post.tag_slugs, tag.slug, update_fields["slug"]))
+            )
+
         for field, value in update_fields.items():
             if hasattr(tag, field):
                 setattr(tag, field, value)
 
         await self.session.commit()
+        await response_cache.invalidate("tags")
+        await response_cache.invalidate("posts")
         await self.session.refresh(tag)
         return tag
 
@@ -88,6 +102,14 @@ class TagService:
                 detail="Tag not found"
             )
 
+        await self.session.execute(
+            update(Post)
+            .where(Post.tag_slugs.contains([tag.slug]))
+            .values(tag_slugs=func.array_remove(Post.tag_slugs, tag.slug))
+        )
+        await self.session.execute(delete(PostTag).where(PostTag.tag_id == tag.id))
         await self.session.delete(tag)
         await self.session.commit()
+        await response_cache.invalidate("tags")
+        await response_cache.invalidate("posts")
         return True
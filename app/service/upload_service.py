@@ -0,0 +1,247 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import asyncio
+import fcntl
+import json
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+
+import aiofiles
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+
+from app.core.settings.settings import settings
+from app.models.video import Video
+from app.service.video_service import VideoService
+
+ALLOWED_CONTENT_TYPES = ["video/mp4", "video/quicktime", "application/octet-stream"]
+ALLOWED_EXTENSIONS = ["mp4"]
+# Длина части имени файла, взятой из названия видео
+FILENAME_TITLE_LENGTH = 64
+
+# Как часто искать брошенные загрузки (секунды)
+CLEANUP_INTERVAL = 600
+_last_cleanup = 0.0
+
+
+def video_filename(title: str, original_filename: Optional[str]) -> str:
+    """Имя файла видео на диске: только буквы, цифры, "_" и "-", расширение из белого списка"""
+    file_extension = original_filename.rsplit(".", 1)[-1].lower() if original_filename and "." in original_filename else ""
+    if file_extension not in ALLOWED_EXTENSIONS:
+        file_extension = ALLOWED_EXTENSIONS[0]
+    slug = re.sub(r"[^\w-]", "_", title)[:FILENAME_TITLE_LENGTH] or "video"
+    unique_id = os.urandom(8).hex()
+    return f"{slug}_{unique_id}.{file_extension}"
+
+
+def video_path(upload_dir: Path, filename: str) -> Path:
+    """Путь файла внутри upload_dir; всё, что выходит за его пределы, - ошибка"""
+    root = upload_dir.resolve()
+    path = (root / filename).resolve()
+    if path.parent != root:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid video filename"
+        )
+    return path
+
+
+class UploadService:
+    """Сервис возобновляемой загрузки видео частями"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.tmp_dir = Path("uploads/tmp")
+        self.upload_dir = Path("uploads/videos")
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def _part_path(self, upload_id: uuid.UUID) -> Path:
+        return self.tmp_dir / f"{upload_id}.part"
+
+    def _meta_path(self, upload_id: uuid.UUID) -> Path:
+        return self.tmp_dir / f"{upload_id}.json"
+
+    async def _load_meta(self, upload_id: uuid.UUID, owner_id: uuid.UUID) -> dict:
+        try:
+            async with aiofiles.open(self._meta_path(upload_id), "r") as f:
+                meta = json.loads(await f.read())
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found"
+            )
+        if meta["owner_id"] != str(owner_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Upload belongs to another user"
+            )
+        return meta
+
+    def _offset(self, upload_id: uuid.UUID) -> int:
+        try:
+            return self._part_path(upload_id).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    @asynccontextmanager
+    async def _locked_part(self, upload_id: uuid.UUID, mode: str):
+        """Открыть .part под flock: запросы к одной загрузке могут прийти в разные воркеры.
+
+        Пока файл занят другим запросом - 409, клиент повторяет позже;
+        если .part уже нет (загрузка завершена или удалена) - 404.
+        """
+        try:
+            f = await aiofiles.open(self._part_path(upload_id), mode)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found"
+            )
+        try:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Upload is being processed by another request"
+                )
+            yield f
+        finally:
+            # Закрытие файла снимает блокировку
+            await f.close()
+
+    async def _maybe_cleanup(self) -> None:
+        global _last_cleanup
+        now = time.monotonic()
+        if now - _last_cleanup < CLEANUP_INTERVAL:
+            return
+        _last_cleanup = now
+        # Обход каталога - синхронные вызовы ФС, не в event loop
+        await asyncio.to_thread(self._cleanup_expired)
+
+    def _cleanup_expired(self) -> None:
+        """Удалить брошенные загрузки старше UPLOAD_EXPIRE_HOURS"""
+        deadline = time.time() - settings.UPLOAD_EXPIRE_HOURS * 3600
+        for path in self.tmp_dir.iterdir():
+            try:
+                if path.stat().st_mtime < deadline:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+    async def create_upload(
+        self,
+        owner_id: uuid.UUID,
+        title: str,
+        size: int,
+        filename: Optional[str] = None,
+        content_type: str = "video/mp4",
+        description: Optional[str] = None,
+        agent: Optional[str] = None,
+        side: Optional[str] = None
+    ) -> dict:
+        """Начать загрузку: сохранить метаданные, файл пока пустой"""
+        if content_type not in ALLOWED_CONTENT_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Only MP4 video files are allowed. Received: {content_type}"
+            )
+        if size <= 0 or size > settings.UPLOAD_MAX_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Video size must be between 1 and {settings.UPLOAD_MAX_BYTES} bytes"
+            )
+
+        await self._maybe_cleanup()
+
+        upload_id = uuid.uuid4()
+        meta = {
+            "owner_id": str(owner_id),
+            "title": title,
+            "size": size,
+            "filename": filename,
+            "description": description,
+            "agent": agent,
+            "side": side,
+        }
+        self._part_path(upload_id).touch()
+        async with aiofiles.open(self._meta_path(upload_id), "w") as f:
+            await f.write(json.dumps(meta))
+
+        return {"upload_id": upload_id, "offset": 0, "size": size}
+
+    async def get_upload(self, upload_id: uuid.UUID, owner_id: uuid.UUID) -> dict:
+        """Сколько байт уже получено"""
+        meta = await self._load_meta(upload_id, owner_id)
+        return {"upload_id": upload_id, "offset": self._offset(upload_id), "size": meta["size"]}
+
+    async def append_chunk(
+        self,
+        upload_id: uuid.UUID,
+        owner_id: uuid.UUID,
+        offset: int,
+        chunks: AsyncIterator[bytes]
+    ) -> dict:
+        """Дописать часть файла, начиная с offset; тело пишется на диск по мере поступления"""
+        # "r+b", а не "ab": дописывать можно только в существующий .part
+        async with self._locked_part(upload_id, "r+b") as f:
+            meta = await self._load_meta(upload_id, owner_id)
+            current = os.fstat(f.fileno()).st_size
+            if offset != current:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Offset mismatch, expected {current}"
+                )
+
+            written = 0
+            await f.seek(current)
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                written += len(chunk)
+                if written > settings.UPLOAD_MAX_CHUNK_BYTES or current + written > meta["size"]:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Chunk exceeds the allowed or declared size"
+                    )
+                await f.write(chunk)
+
+        return {"upload_id": upload_id, "offset": current + written, "size": meta["size"]}
+
+    async def finalize(self, upload_id: uuid.UUID, owner_id: uuid.UUID) -> Video:
+        """Завершить загрузку: перенести файл и создать запись видео"""
+        # Та же блокировка, что у дозаписи: повторный finalize получит 409 или 404
+        async with self._locked_part(upload_id, "rb") as f:
+            # Метаданные читаются под блокировкой: завершённая загрузка их уже удалила
+            meta = await self._load_meta(upload_id, owner_id)
+
+            offset = os.fstat(f.fileno()).st_size
+            if offset != meta["size"]:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Upload incomplete: {offset} of {meta['size']} bytes received"
+                )
+
+            self.upload_dir.mkdir(parents=True, exist_ok=True)
+            filename = video_filename(meta["title"], meta["filename"])
+            target = video_path(self.upload_dir, filename)
+            os.replace(self._part_path(upload_id), target)
+
+            try:
+                video = await VideoService(self.session).create_video(
+                    owner_id=owner_id,
+                    title=meta["title"],
+                    video_url=f"/uploads/videos/{filename}",
+                    description=meta["description"],
+                    agent=meta["agent"],
+                    side=meta["side"]
+                )
+            except Exception:
+                # Возвращаем файл, чтобы finalize можно было повторить
+                os.replace(target, self._part_path(upload_id))
+                raise
+            self._meta_path(upload_id).unlink(missing_ok=True)
+        return video
@@ -1,11 +1,31 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import uuid
-from sqlalchemy import select, desc
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 from fastapi import HTTPException, status
 
 from app.models.video import Video
+from app.models.user import User
+from app.models.map import Map
+from app.core.pagination import keyset_paginate, keyset_page, encode_cursor, decode_cursor, cursor_sort_key
+from app.core.fields import FieldSelection, sparse_options
+from app.core.cache import response_cache
+from app.core.view_counter import view_counter
+from app.core.trending import trending
+from app.core.settings.settings import settings
+
+# Сводки владельца и карты приходят тем же запросом через LEFT JOIN
+SUMMARY_LOADERS = {
+    "owner": joinedload(Video.owner).load_only(User.id, User.username, User.avatar_url),
+    "map": joinedload(Video.map).load_only(Map.id, Map.name, Map.slug),
+}
+
+
+def _feed_options(fields: Optional[FieldSelection], sort_column) -> List:
+    if fields:
+        return sparse_options(Video, fields, sort_column, loaders=SUMMARY_LOADERS)
+    return list(SUMMARY_LOADERS.values())
 
 
 class VideoService:
@@ -20,45 +40,132 @@ class VideoService:
         result = await self.session.execute(
             select(Video)
             .where(Video.id == video_id)
-            .options(selectinload(Video.owner))
+            .options(*SUMMARY_LOADERS.values())
         )
         return result.scalars().first()
 
-    async def get_user_videos(self, user_id: uuid.UUID, skip: int = 0, limit: int = 20) -> List[Video]:
+    async def get_videos(
+        self,
+        published: bool = True,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        fields: Optional[FieldSelection] = None
+    ) -> Tuple[List[Video], Optional[str]]:
+        """Получить ленту видео (новые сверху)"""
+        query = keyset_paginate(
+            select(Video)
+            .where(Video.published == published)
+            .options(*_feed_options(fields, Video.created_at)),
+            Video.created_at, Video.id, cursor, limit
+        )
+        result = await self.session.execute(query)
+        return keyset_page(result.scalars().all(), Video.created_at, limit)
+
+    async def get_user_videos(
+        self,
+        user_id: uuid.UUID,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        fields: Optional[FieldSelection] = None
+    ) -> Tuple[List[Video], Optional[str]]:
         """Получить видео пользователя"""
-        result = await self.session.execute(
+        query = keyset_paginate(
             select(Video)
             .where(Video.owner_id == user_id)
-            .options(selectinload(Video.owner))
-            .order_by(desc(Video.created_at))
-            .offset(skip)
-            .limit(limit)
+            .options(*_feed_options(fields, Video.created_at)),
+            Video.created_at, Video.id, cursor, limit
         )
-        return result.scalars().all()
+        result = await self.session.execute(query)
+        return keyset_page(result.scalars().all(), Video.created_at, limit)
 
-    async def get_videos_by_agent(self, agent: str, skip: int = 0, limit: int = 20) -> List[Video]:
+    async def get_videos_by_agent(
+        self,
+        agent: str,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        fields: Optional[FieldSelection] = None
+    ) -> Tuple[List[Video], Optional[str]]:
         """Получить видео по агенту"""
-        result = await self.session.execute(
+        return await self._get_videos_by_views(Video.agent == agent, cursor, limit, fields)
+
+    async def get_videos_by_map(
+        self,
+        map_id: uuid.UUID,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        fields: Optional[FieldSelection] = None
+    ) -> Tuple[List[Video], Optional[str]]:
+        """Получить видео по карте"""
+        return await self._get_videos_by_views(Video.map_id == map_id, cursor, limit, fields)
+
+    async def _get_videos_by_views(
+        self,
+        condition,
+        cursor: Optional[str],
+        limit: int,
+        fields: Optional[FieldSelection]
+    ) -> Tuple[List[Video], Optional[str]]:
+        query = keyset_paginate(
             select(Video)
-            .where(Video.agent == agent)
-            .options(selectinload(Video.owner))
-            .order_by(desc(Video.views))
-            .offset(skip)
-            .limit(limit)
+            .where(condition)
+            .options(*_feed_options(fields, Video.views)),
+            Video.views, Video.id, cursor, limit
         )
-        return result.scalars().all()
+        result = await self.session.execute(query)
+        return keyset_page(result.scalars().all(), Video.views, limit)
+
+    async def get_hot_videos(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        fields: Optional[FieldSelection] = None,
+        agent: Optional[str] = None,
+        map_id: Optional[uuid.UUID] = None
+    ) -> Tuple[List[Video], Optional[str]]:
+        """Получить "горячие" видео (всех, агента или карты) из рейтинга с затуханием.
+
+        Пока рейтинг пуст или Redis не отвечает, лента отдаётся по просмотрам;
+        если рейтинг не ведётся вовсе (несколько воркеров без Redis) - 503.
+        """
+        if not trending.available:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Hot ranking is unavailable: REDIS_URL is not configured"
+            )
+        condition = Video.published == True
+        if agent:
+            condition &= Video.agent == agent
+        if map_id:
+            condition &= Video.map_id == map_id
+        if cursor and cursor_sort_key(cursor) == Video.views.key:
+            # Продолжение ленты по просмотрам, начатой без рейтинга
+            return await self._get_videos_by_views(condition, cursor, limit, fields)
+
+        offset = 0
+        if cursor:
+            offset, _ = decode_cursor("hot", cursor, int)
+            if offset < 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor"
+                )
+        ranked = await trending.top(trending.scopes(agent, map_id)[-1], offset, limit + 1)
+        if ranked is None or (not ranked and offset == 0):
+            return await self._get_videos_by_views(condition, None, limit, fields)
+        ids = [uuid.UUID(member) for member, _ in ranked]
+        if not ids:
+            return [], None
 
-    async def get_videos_by_map(self, map_id: uuid.UUID, skip: int = 0, limit: int = 20) -> List[Video]:
-        """Получить видео по карте"""
         result = await self.session.execute(
             select(Video)
-            .where(Video.map_id == map_id)
-            .options(selectinload(Video.owner))
-            .order_by(desc(Video.views))
-            .offset(skip)
-            .limit(limit)
+            .where(Video.id.in_(ids[:limit]), condition)
+            .options(*_feed_options(fields, Video.created_at))
         )
-        return result.scalars().all()
+        by_id = {video.id: video for video in result.scalars().all()}
+        # Порядок задаёт рейтинг; удалённые и снятые с публикации видео пропускаем
+        videos = [by_id[video_id] for video_id in ids[:limit] if video_id in by_id]
+        next_cursor = encode_cursor("hot", offset + limit, ids[limit - 1]) if len(ids) > limit else None
+        return videos, next_cursor
 
     async def create_video(
         self,
@@ -85,6 +192,7 @@ class VideoService:
 
         self.session.add(video)
         await self.session.commit()
+        await response_cache.invalidate("videos")
         await self.session.refresh(video)
         return video
 
@@ -104,50 +212,14 @@ class VideoService:
                 setattr(video, field, value)
 
         await self.session.commit()
+        await response_cache.invalidate("videos")
         await self.session.refresh(video)
         return video
 
-    async def increment_views(self, video_id: uuid.UUID) -> Video:
-        """Увеличить количество просмотров"""
-        video = await self.get_video_by_id(video_id)
-        if not video:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Video not found"
-            )
-
-        video.views += 1
-        await self.session.commit()
-        await self.session.refresh(video)
-        return video
-
-    async def like_video(self, video_id: uuid.UUID) -> Video:
-        """Добавить лайк к видео"""
-        video = await self.get_video_by_id(video_id)
-        if not video:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Video not found"
-            )
-
-        video.likes += 1
-        await self.session.commit()
-        await self.session.refresh(video)
-        return video
-
-    async def dislike_video(self, video_id: uuid.UUID) -> Video:
-        """Добавить дизлайк к видео"""
-        video = await self.get_video_by_id(video_id)
-        if not video:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Video not found"
-            )
-
-        video.dislikes += 1
-        await self.session.commit()
-        await self.session.refresh(video)
-        return video
+    async def increment_views(self, video: Video) -> None:
+        """Увеличить количество просмотров (запись в базу - пачкой в фоне)"""
+        view_counter.increment(Video, video.id)
+        trending.record(video.id, settings.TRENDING_VIEW_WEIGHT, trending.scopes(video.agent, video.map_id))
 
     async def delete_video(self, video_id: uuid.UUID) -> bool:
         """Удалить видео"""
@@ -160,4 +232,5 @@ class VideoService:
 
         await self.session.delete(video)
         await self.session.commit()
+        await response_cache.invalidate("videos")
         return True
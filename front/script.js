@@ -238,8 +238,9 @@ function updateUIForAuth() {
 async function loadVideos(filters = {}) {
   try {
     // В реальном приложении можно фильтровать по agent_id, map_id
-    const videos = await apiRequest('/videos/');
-    return videos || [];
+    // API возвращает {videos: [...], count: ..., next_cursor: ...}
+    const response = await apiRequest('/videos/');
+    return (response && response.videos) || [];
   } catch (error) {
     console.error('Failed to load videos:', error);
     return [];
@@ -283,7 +284,7 @@ async function dislikeVideo(videoId) {
 function renderVideoCard(video) {
   const card = document.createElement('article');
   card.className = 'card';
-  card.dataset.agent = video.agent?.name || 'Unknown';
+  card.dataset.agent = video.agent || 'Unknown';
   card.dataset.side = video.side || 'Unknown';
   card.dataset.owner = video.owner?.username || 'Anonymous';
   card.style.cursor = 'pointer';
@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+
+# ensure project root is on sys.path so `app` imports work
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.settings.settings import settings
+
+# Денормализованные счётчики и запросы, пересчитывающие их с нуля.
+# Обновляются только разошедшиеся строки.
+COUNTERS = {
+    "posts.comment_count": """
+        UPDATE linap.posts p
+        SET comment_count = coalesce(s.cnt, 0)
+        FROM linap.posts p2
+        LEFT JOIN (
+            SELECT post_id, count(*) AS cnt FROM linap.comments
+            WHERE NOT is_deleted GROUP BY post_id
+        ) s ON s.post_id = p2.id
+        WHERE p.id = p2.id AND p.comment_count IS DISTINCT FROM coalesce(s.cnt, 0)
+    """,
+    "comments.reply_count": """
+        UPDATE linap.comments c
+        SET reply_count = coalesce(s.cnt, 0)
+        FROM linap.comments c2
+        LEFT JOIN (
+            SELECT parent_id, count(*) AS cnt FROM linap.comments
+            WHERE parent_id IS NOT NULL GROUP BY parent_id
+        ) s ON s.parent_id = c2.id
+        WHERE c.id = c2.id AND c.reply_count IS DISTINCT FROM coalesce(s.cnt, 0)
+    """,
+    "tags.post_count": """
+        UPDATE linap.tags t
+        SET post_count = coalesce(s.cnt, 0)
+        FROM linap.tags t2
+        LEFT JOIN (
+            SELECT pt.tag_id, count(*) AS cnt
+            FROM linap.post_tags pt
+            JOIN linap.posts p ON p.id = pt.post_id
+            WHERE p.published
+            GROUP BY pt.tag_id
+        ) s ON s.tag_id = t2.id
+        WHERE t.id = t2.id AND t.post_count IS DISTINCT FROM coalesce(s.cnt, 0)
+    """,
+}
+
+
+if __name__ == "__main__":
+    # python scripts/reconcile_counters.py [posts.comment_count ...] - по умолчанию все счётчики
+    names = sys.argv[1:] or list(COUNTERS)
+    unknown = [name for name in names if name not in COUNTERS]
+    if unknown:
+        print("ERROR: unknown counters:", ", ".join(unknown), "| available:", ", ".join(COUNTERS))
+        sys.exit(2)
+
+    e = create_engine(settings.db_url_sync)
+    try:
+        for name in names:
+            # Каждый счётчик - своей транзакцией, чтобы не держать блокировки на всех таблицах сразу
+            with e.begin() as c:
+                fixed = c.execute(text(COUNTERS[name])).rowcount
+            print(f"OK: {name}: fixed {fixed} rows")
+    except Exception as exc:
+        print("ERROR:", exc)
+        raise
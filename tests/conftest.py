@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# ensure project root and scripts are on sys.path so `app` and script imports work
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
@@ -0,0 +1,36 @@
+import json
+
+from app.core.metrics import Metrics, MetricsWriter, RequestStats
+
+
+def _worker(requests: int, in_flight: int) -> dict:
+    worker = Metrics()
+    stats = RequestStats()
+    stats.queries = 2
+    for _ in range(requests):
+        worker.observe_request("GET", "/api/v1/videos/", 200, 0.02, stats)
+    worker.in_flight = in_flight
+    # Через файл METRICS_DIR метрики проходят как JSON
+    return json.loads(json.dumps(worker.dump()))
+
+
+def test_merge_sums_counters_of_all_workers():
+    total = Metrics()
+    total.merge(_worker(requests=3, in_flight=1), alive=True)
+    total.merge(_worker(requests=2, in_flight=4), alive=False)
+
+    key = ("GET", "/api/v1/videos/")
+    assert total.requests[key + (200,)] == 5
+    assert total.db_queries[key] == 10
+    assert sum(total.latency.series[key][0]) == 5
+    # Запросы в работе есть только у живых воркеров
+    assert total.in_flight == 1
+
+
+def test_merged_metrics_render_as_one_series():
+    total = Metrics()
+    total.merge(_worker(requests=1, in_flight=0))
+    total.merge(_worker(requests=1, in_flight=0))
+    out = MetricsWriter()
+    total.write(out)
+    assert 'linap_http_requests_total{method="GET",route="/api/v1/videos/",status="200"} 2' in out.render()
@@ -0,0 +1,46 @@
+import pytest
+
+from app.core import query_guard
+from app.core.metrics import track_queries
+from app.core.query_guard import QueryBudgetExceeded
+from app.core.settings.settings import settings
+
+STATEMENT = "SELECT linap.users.id, linap.users.username FROM linap.users WHERE linap.users.id = $1::UUID"
+
+
+def _execute(stats, statement: str) -> None:
+    # То же, что делает обработчик after_cursor_execute из instrument_engine
+    stats.queries += 1
+    query_guard.observe(stats.statements, stats.queries, statement)
+
+
+def test_normalize_ignores_parameters_and_literals():
+    assert query_guard.normalize("SELECT * FROM t WHERE id = $1 AND n > 10") == \
+        query_guard.normalize("SELECT *  FROM t\n WHERE id = $2 AND n > 20")
+
+
+def test_repeated_statement_raises_in_strict_mode(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_GUARD_STRICT", True)
+    monkeypatch.setattr(settings, "QUERY_REPEAT_LIMIT", 5)
+    with pytest.raises(QueryBudgetExceeded, match="repeated 6 times"):
+        with track_queries("n+1") as stats:
+            for _ in range(6):
+                _execute(stats, STATEMENT)
+    assert stats.statements[query_guard.normalize(STATEMENT)][0] == 6
+
+
+def test_too_many_queries_raise_in_strict_mode(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_GUARD_STRICT", True)
+    monkeypatch.setattr(settings, "QUERY_COUNT_LIMIT", 3)
+    with pytest.raises(QueryBudgetExceeded, match="4 queries"):
+        with track_queries("chatty") as stats:
+            for table in ("users", "videos", "posts", "tags"):
+                _execute(stats, f"SELECT id FROM linap.{table}")
+
+
+def test_repeats_are_only_counted_without_strict_mode(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_GUARD_STRICT", False)
+    with track_queries("n+1") as stats:
+        for _ in range(settings.QUERY_REPEAT_LIMIT + 1):
+            _execute(stats, STATEMENT)
+    assert query_guard.repeated(stats.statements)[0]["count"] == settings.QUERY_REPEAT_LIMIT + 1
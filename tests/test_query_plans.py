@@ -0,0 +1,38 @@
+import asyncio
+import os
+
+import pytest
+
+import check_query_plans as plans
+from app.core.settings.settings import settings
+
+
+def _dsn() -> str:
+    try:
+        return plans.local_dsn(os.environ.get(plans.DSN_ENV))
+    except ValueError as e:
+        pytest.skip(str(e))
+
+
+async def _run_case(dsn: str, name: str, case) -> tuple:
+    engine = plans.plan_engine(dsn)
+    try:
+        try:
+            fixtures = await plans.prepare(engine, seed=False)
+        except OSError as e:
+            pytest.skip(f"database is not reachable: {e}")
+        missing = [key for key, value in fixtures.items() if value is None]
+        if missing:
+            pytest.skip(f"not enough data for fixtures: {', '.join(missing)} (run the script with --seed)")
+        return await plans.check_case(engine, name, case, fixtures)
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.parametrize("name, case", plans.CASES, ids=[name for name, _ in plans.CASES])
+def test_query_uses_indexes(name, case, monkeypatch):
+    dsn = _dsn()
+    # Лишние и повторяющиеся запросы роняют тест так же, как Seq Scan
+    monkeypatch.setattr(settings, "QUERY_GUARD_STRICT", True)
+    _, problems = asyncio.run(_run_case(dsn, name, case))
+    assert not problems, f"{name}: Seq Scan on {', '.join(problems)}"